@@ -0,0 +1,243 @@
+"""
+CSC111 Winter 2023 Project: Steam Game Recommender
+
+This module consists of a kernel that ranks the recommended games of a whole block of user profiles at once, for
+nightly jobs that score far more profiles than the interactive program does.
+
+A block of profiles is given as a sparse played game matrix (the game ids that each profile has played), a sparse
+genre preference matrix (the genres that each profile wants) and a budget vector (the maximum price of each profile).
+The catalog's tags are stored as a sparse matrix too, in the form of an inverted index from each tag to the games
+that have it. Everything that does not depend on a profile is computed once per catalog, and everything that only
+depends on a profile's genres, such as which games satisfy its genre requirements, is computed once per block for
+each distinct set of genres. What is left for each profile is a scan over the games in descending order of their
+price and positive ratio term, which stops as soon as no remaining game can make it into the profile's top games.
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2023 Mikhael Orteza, Muaj Ahmed, Cheng Peng, and Ari Casas Nassar
+"""
+from __future__ import annotations
+from typing import Optional
+import random
+import time
+from catalog_scoring import AnytimeRecommender, CatalogScorer, push_bounded
+from game_graph import Game
+
+
+class BatchScoringKernel:
+    """A kernel that ranks the recommended games of blocks of user profiles for a fixed catalog. The games are ranked
+    in the same way as GameGraph.highest_scoring_games ranks them, and ties are broken in favour of the lower game id.
+
+    Representation Invariants:
+    - len(self._games) == len(self._game_price_ratio) == len(self._genre_price_ratio)
+    - sorted(self._game_order) == list(range(len(self._games)))
+    """
+    # Private Instance Attributes:
+    # - _scorer: A scorer for the catalog, which every profile's scorer is derived from.
+    # - _games: The games of the catalog. A game is referred to by its index in this list, i.e., its column.
+    # - _columns: A mapping from game ids to their column.
+    # - _lowered_genres: The lowercased genres of the game in each column.
+    # - _tag_columns: The sparse tag matrix, as a mapping from each lowercased tag to the columns of the games that
+    #   have it. A column appears once for every time that its game has the tag, just like Game.genre_count counts.
+    # - _game_price_ratio: The price and positive ratio term of each column when the user has inputted games.
+    # - _genre_price_ratio: The price and positive ratio term of each column when the user has not inputted games.
+    # - _game_order: All columns in descending order of their _game_price_ratio.
+    # - _sorted_ids: The ids of all the games in ascending order.
+
+    _scorer: CatalogScorer
+    _games: list[Game]
+    _columns: dict[int, int]
+    _lowered_genres: list[list[str]]
+    _tag_columns: dict[str, list[int]]
+    _game_price_ratio: list[float]
+    _genre_price_ratio: list[float]
+    _game_order: list[int]
+    _sorted_ids: list[int]
+
+    def __init__(self, catalog: list[Game]) -> None:
+        """Initializes the kernel by computing everything that does not depend on any profile
+
+        Preconditions:
+        - catalog != []
+        - all game ids in the catalog are unique
+        """
+        self._scorer = CatalogScorer(catalog, [], [], float('inf'))
+        game_mode_scorer = self._scorer.for_user([catalog[0].game_id], [], float('inf'))
+        genre_mode_scorer = self._scorer.for_user([], [''], float('inf'))
+
+        self._games = list(catalog)
+        self._columns = {game.game_id: column for column, game in enumerate(self._games)}
+        self._lowered_genres = [[genre.lower() for genre in game.genres] for game in self._games]
+        self._tag_columns = {}
+        for column in range(0, len(self._games)):
+            for tag in self._lowered_genres[column]:
+                self._tag_columns.setdefault(tag, []).append(column)
+
+        self._game_price_ratio = [game_mode_scorer.price_ratio_score(game) for game in self._games]
+        self._genre_price_ratio = [genre_mode_scorer.price_ratio_score(game) for game in self._games]
+        self._game_order = sorted(range(0, len(self._games)),
+                                  key=lambda column: (-self._game_price_ratio[column], self._games[column].game_id))
+        self._sorted_ids = sorted(self._columns)
+
+    def rank_block(self, played: list[list[int]], genres: list[list[str]], budgets: list[float],
+                   total: int) -> list[list[tuple[int, float]]]:
+        """Returns the ids and metascores of the total top recommended games of every profile in the block, in
+        descending order of their metascore. Profile i has played the games in played[i], wants the genres in
+        genres[i] and is willing to pay at most budgets[i].
+
+        Preconditions:
+        - len(played) == len(genres) == len(budgets)
+        - all(played[i] != [] or genres[i] != [] for i in range(len(played)))
+        - total >= 0
+        """
+        # The genre counts and rankings that are shared by the profiles of the block with the same genres.
+        genre_counts = {}
+        rankings = {}
+
+        result = []
+        for profile in range(0, len(played)):
+            lowered = frozenset(genre.lower() for genre in genres[profile])
+            if lowered not in genre_counts:
+                genre_counts[lowered] = self._genre_counts(lowered)
+
+            if played[profile]:
+                result.append(self._rank_played(played[profile], genres[profile], budgets[profile], total,
+                                                genre_counts[lowered], rankings))
+            else:
+                result.append(self._rank_genres(genres[profile], budgets[profile], total, genre_counts[lowered],
+                                                rankings))
+        return result
+
+    def _genre_counts(self, lowered_genres: frozenset[str]) -> list[int]:
+        """Returns the number of genres that the game in each column has out of the given lowercased genres, which is
+        the product of the genres' row of the genre preference matrix with the tag matrix."""
+        counts = [0] * len(self._games)
+        for genre in lowered_genres:
+            for column in self._tag_columns.get(genre, []):
+                counts[column] += 1
+        return counts
+
+    def _rank_played(self, played: list[int], genres: list[str], budget: float, total: int, genre_counts: list[int],
+                     rankings: dict) -> list[tuple[int, float]]:
+        """Returns the ids and metascores of the total top recommended games of a profile that has played games"""
+        scorer = self._scorer.for_user(played, genres, budget)
+        user_columns = {self._columns[game_id] for game_id in played if game_id in self._columns}
+        if len(self._games) <= len(user_columns) or total == 0:
+            return []
+
+        # The games that satisfy the profile's genre requirements only depend on its genres and number of games.
+        key = ('played', frozenset(genre.lower() for genre in genres), len(user_columns))
+        if key not in rankings:
+            rankings[key] = [column for column in self._game_order if genre_counts[column] == len(user_columns)]
+
+        lowered_user_genres = scorer.shared_tag_genres()
+        neighbour_score = scorer.neighbour_score()
+
+        # A min-heap of the best (metascore, negated game id) pairs found so far.
+        best_so_far = []
+        for column in rankings[key]:
+            if len(best_so_far) == total and \
+                    scorer.score_upper_bound(self._game_price_ratio[column]) < best_so_far[0][0]:
+                break
+            if column in user_columns or self._games[column].price > budget:
+                continue
+            shared = sum(map(lowered_user_genres.__contains__, self._lowered_genres[column]))
+            push_bounded(best_so_far, (self._game_price_ratio[column] + neighbour_score + scorer.genre_score(shared),
+                                       -self._games[column].game_id), total)
+
+        if len(best_so_far) < total:
+            # Every eligible game has been ranked, so the rest of the spots go to games that are rated 0.0.
+            chosen = {-negated_id for _, negated_id in best_so_far}
+            self._fill_with_zeros(best_so_far, total, chosen | {self._games[column].game_id for column in user_columns})
+        return [(-negated_id, score) for score, negated_id in sorted(best_so_far, reverse=True)]
+
+    def _rank_genres(self, genres: list[str], budget: float, total: int, genre_counts: list[int],
+                     rankings: dict) -> list[tuple[int, float]]:
+        """Returns the ids and metascores of the total top recommended games of a profile that has not played any
+        games"""
+        # Without played games, the metascore of a game only depends on the profile's genres and budget.
+        key = ('genres', frozenset(genre.lower() for genre in genres), len(genres))
+        if key not in rankings:
+            scorer = self._scorer.for_user([], genres, budget)
+            scores = [scorer.genre_score(genre_counts[column]) + self._genre_price_ratio[column]
+                      for column in range(0, len(self._games))]
+            rankings[key] = sorted(((scores[column], -self._games[column].game_id)
+                                    for column in range(0, len(self._games))), reverse=True)
+
+        best_so_far = []
+        for score, negated_id in rankings[key]:
+            if len(best_so_far) == total:
+                break
+            if self._games[self._columns[-negated_id]].price <= budget:
+                best_so_far.append((score, negated_id))
+
+        if len(best_so_far) < total:
+            chosen = {-negated_id for _, negated_id in best_so_far}
+            self._fill_with_zeros(best_so_far, total, chosen)
+        return [(-negated_id, score) for score, negated_id in sorted(best_so_far, reverse=True)]
+
+    def _fill_with_zeros(self, best_so_far: list[tuple[float, int]], total: int, excluded_ids: set[int]) -> None:
+        """Adds games that are rated 0.0 to best_so_far, in ascending order of their id, until it holds total games.
+        The games with an id in excluded_ids are skipped."""
+        for game_id in self._sorted_ids:
+            if len(best_so_far) >= total:
+                return
+            if game_id not in excluded_ids:
+                best_so_far.append((0.0, -game_id))
+
+
+def run_benchmark(num_games: int = 5000, num_profiles: int = 2000, block_size: int = 500, total: int = 10,
+                  seed: Optional[int] = 111) -> None:
+    """Prints the throughput of the kernel, in profiles per second, against scoring the same randomized profiles one
+    at a time, both with a CatalogScorer and with a whole game graph. This process only uses one core, so the
+    throughputs are per core.
+
+    Preconditions:
+    - num_games >= 2
+    - num_profiles > 0 and block_size > 0
+    - total >= 0
+    """
+    # The harness is only imported here, since it imports every engine that it checks.
+    import differential_harness
+
+    rng = random.Random(seed)
+    catalog = differential_harness.random_catalog(rng, num_games)
+    profiles = [differential_harness.random_profile(rng, catalog) for _ in range(num_profiles)]
+
+    start = time.perf_counter()
+    kernel = BatchScoringKernel(catalog)
+    setup_time = time.perf_counter() - start
+    batched = []
+    start = time.perf_counter()
+    for block_start in range(0, num_profiles, block_size):
+        block = profiles[block_start:block_start + block_size]
+        batched.extend(kernel.rank_block([profile[0] for profile in block], [profile[1] for profile in block],
+                                         [profile[2] for profile in block], total))
+    batched_time = time.perf_counter() - start
+    print(f'batched kernel: {num_profiles / batched_time:.1f} profiles/s (plus {setup_time:.3f}s of setup)')
+
+    start = time.perf_counter()
+    recommender = AnytimeRecommender(catalog)
+    divergent = 0
+    for profile in range(0, num_profiles):
+        games = recommender.recommend(*profiles[profile], total, deadline=float('inf')).games
+        expected = [(game.game_id, game.rating) for game in games]
+        divergent += bool(differential_harness.compare_rankings(expected, batched[profile], 1e-9))
+    one_at_a_time_time = time.perf_counter() - start
+    print(f'one at a time: {num_profiles / one_at_a_time_time:.1f} profiles/s, '
+          f'{divergent} profiles ranked differently from the batched kernel')
+
+    graph_profiles = min(num_profiles, 3)
+    start = time.perf_counter()
+    for profile in range(0, graph_profiles):
+        differential_harness.reference_engine(catalog, *profiles[profile], total)
+    graph_time = time.perf_counter() - start
+    print(f'one game graph at a time: {graph_profiles / graph_time:.3f} profiles/s')
+
+
+if __name__ == '__main__':
+    run_benchmark()
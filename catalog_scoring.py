@@ -0,0 +1,471 @@
+"""
+CSC111 Winter 2023 Project: Steam Game Recommender
+
+This module consists of a scorer that computes the same metascores as the game graph without building the graph,
+and an anytime recommender that uses it to give the best recommendations that it can find within a latency deadline.
+
+In the game graph, every game that the user has not played is a neighbour of exactly the user's games, so the
+neighbour terms of its score only depend on the user's games and the whole graph never needs to be built to score it.
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2023 Mikhael Orteza, Muaj Ahmed, Cheng Peng, and Ari Casas Nassar
+"""
+from __future__ import annotations
+from typing import Iterator
+import collections
+import copy
+import heapq
+import itertools
+import time
+from game_graph import Game
+
+# The number of games that are scored or counted in between two checks of the deadline.
+DEADLINE_CHECK_INTERVAL = 64
+
+
+class CatalogScorer:
+    """Scores the games of a catalog in the same way as GameGraph.compute_score, without building a game graph.
+
+    Instance Attributes:
+    - user_game_ids:
+        All the games that the user has played/or wants recommendations to be based on.
+    - user_game_genres:
+        All the genres that the user wants recommendations to be based on.
+    - user_max_price:
+        The maximum price that the user is willing to pay for a game.
+
+    Representation Invariants:
+    - self.user_max_price >= 0.0
+    - all(game_id in self.user_game_ids for game_id in self._user_games)
+    """
+    # Private Instance Attributes:
+    # - _games: A mapping from game ids to all the games in the catalog.
+    # - _user_games: A mapping from game ids to the games in the catalog that the user has played.
+    # - _user_genres: All the genres of the user's games, in the same order as GameGraph.user_genres.
+    # - _num_games: The number of games in the catalog.
+    # - _max_price: The highest price out of all the games in the catalog.
+    # - _max_ratio: The highest positive ratio out of all the games in the catalog.
+    # - _total_ratio: The sum of the positive ratios of all the games in the catalog.
+    # - _user_ratio: The sum of the positive ratios of the user's games.
+    # - _lowered_user_genres: The lowercased genres of the user's games.
+    # - _lowered_game_genres: The lowercased genres that the user wants recommendations to be based on.
+
+    user_game_ids: list[int]
+    user_game_genres: list[str]
+    user_max_price: float
+    _games: dict[int, Game]
+    _user_games: dict[int, Game]
+    _user_genres: list[str]
+    _num_games: int
+    _max_price: float
+    _max_ratio: int
+    _total_ratio: int
+    _user_ratio: int
+    _lowered_user_genres: set[str]
+    _lowered_game_genres: set[str]
+
+    def __init__(self, catalog: list[Game], user_game_ids: list[int], user_game_genres: list[str],
+                 user_max_price: float) -> None:
+        """Initializes the scorer by computing all the catalog wide values that the scores depend on
+
+        Preconditions:
+        - catalog != []
+        """
+        self._games = {}
+        self._max_price = 0.0
+        self._max_ratio = 0
+        self._total_ratio = 0
+
+        for game in catalog:
+            if game.price > self._max_price:
+                self._max_price = game.price
+            if game.positive_ratio > self._max_ratio:
+                self._max_ratio = game.positive_ratio
+            self._total_ratio += game.positive_ratio
+            self._games[game.game_id] = game
+        self._num_games = len(catalog)
+
+        self._set_user(user_game_ids, user_game_genres, user_max_price)
+
+    def for_user(self, user_game_ids: list[int], user_game_genres: list[str], user_max_price: float) -> CatalogScorer:
+        """Returns a scorer for the same catalog but another user's preferences. Unlike creating a new scorer, this
+        only takes time proportional to the number of games that the user has played.
+        """
+        scorer = copy.copy(self)
+        scorer._set_user(user_game_ids, user_game_genres, user_max_price)
+        return scorer
+
+    def _set_user(self, user_game_ids: list[int], user_game_genres: list[str], user_max_price: float) -> None:
+        """Computes all the values that the scores depend on which are specific to the user's preferences"""
+        self.user_game_ids = user_game_ids
+        self.user_game_genres = user_game_genres
+        self.user_max_price = user_max_price
+        self._user_games = {game_id: self._games[game_id] for game_id in user_game_ids if game_id in self._games}
+
+        if user_game_ids and not self._user_games:
+            raise ValueError("None of the user's games are in the catalog.")
+
+        self._user_genres = []
+        for game_id in self._user_games:
+            for genre in self._user_games[game_id].genres:
+                if genre not in self._user_genres:
+                    self._user_genres.append(genre)
+        self._user_ratio = sum(self._user_games[game_id].positive_ratio for game_id in self._user_games)
+
+        self._lowered_user_genres = {genre.lower() for genre in self._user_genres}
+        self._lowered_game_genres = {genre.lower() for genre in user_game_genres}
+
+    def game(self, game_id: int) -> Game:
+        """Returns the game in the catalog with the given id
+
+        Preconditions:
+        - a game with game_id is in the scorer's catalog
+        """
+        return self._games[game_id]
+
+    def is_user_game(self, game: Game) -> bool:
+        """Returns whether the user has played the given game"""
+        return game.game_id in self._user_games
+
+    def is_eligible(self, game: Game) -> bool:
+        """Returns whether the given game can be rated above 0.0, i.e., whether it is within the user's budget and,
+        if the user has inputted games, whether it satisfies the genre requirements of GameGraph.compute_score_game.
+        """
+        if game.price > self.user_max_price:
+            return False
+        return not self.user_game_ids or _genre_count(game, self._lowered_game_genres) == len(self._user_games)
+
+    def shared_tags(self, game: Game) -> int:
+        """Returns the number of tags that the given game shares with the user's games, or with the user's genres if
+        the user has not inputted any games.
+        """
+        if self.user_game_ids:
+            return _genre_count(game, self._lowered_user_genres)
+        else:
+            return _genre_count(game, self._lowered_game_genres)
+
+    def shared_tag_genres(self) -> set[str]:
+        """Returns the lowercased genres that shared_tags counts the tags of a game out of"""
+        if self.user_game_ids:
+            return self._lowered_user_genres
+        else:
+            return self._lowered_game_genres
+
+    def candidates(self, catalog: list[Game]) -> list[Game]:
+        """Returns the games of the catalog that can be recommended, in the same way as
+        GameGraph.highest_scoring_games chooses them.
+        """
+        return [game for game in catalog if self.is_candidate(game)]
+
+    def is_candidate(self, game: Game) -> bool:
+        """Returns whether the given game of the catalog can be recommended, in the same way as
+        GameGraph.highest_scoring_games chooses the games to recommend.
+        """
+        return not (self._user_games and self._num_games > 1 and game.game_id in self._user_games)
+
+    def num_candidates(self) -> int:
+        """Returns the number of games of the catalog that can be recommended"""
+        if self._user_games and self._num_games > 1:
+            return self._num_games - len(self._user_games)
+        else:
+            return self._num_games
+
+    def score(self, game: Game) -> float:
+        """Returns the metascore of the given game, which is equal to the rating that GameGraph.compute_score would
+        assign to the game in a game graph made up of the scorer's catalog.
+
+        Preconditions:
+        - game is in the scorer's catalog
+        """
+        if not self.is_eligible(game):
+            return 0.0
+        return self.base_score(game)
+
+    def base_score(self, game: Game) -> float:
+        """Returns the metascore that the given game would have if it were within the user's budget and satisfied the
+        user's genre requirements.
+
+        Preconditions:
+        - game is in the scorer's catalog
+        """
+        if not self.user_game_ids:
+            return self._score_genre(game)
+        else:
+            return self._score_game(game)
+
+    def price_ratio_score(self, game: Game) -> float:
+        """Returns the price and positive ratio term of the given game's metascore"""
+        if not self.user_game_ids:
+            return self._rate_price(game, 0.6)
+        else:
+            return self._rate_price(game, 0.5)
+
+    def neighbour_score(self) -> float:
+        """Returns the neighbour terms of the metascore of any game that the user has not played.
+
+        Preconditions:
+        - self.user_game_ids != []
+        """
+        neighbour_weight = 0.3
+        neighbour_ratio_weight = 0.1
+
+        # Every game that the user has not played is a neighbour of exactly the user's games.
+        num_neighbours = len(self._user_games)
+        neighbour_ratio = self._user_ratio / num_neighbours
+
+        neighbour_score1 = (num_neighbours / len(self._user_games)) * neighbour_weight
+        neighbour_score2 = (neighbour_ratio / 100) * neighbour_ratio_weight
+        return neighbour_score1 + neighbour_score2
+
+    def genre_score(self, shared_genres: int) -> float:
+        """Returns the genre term of the metascore of a game that has shared_genres of the genres that the user's
+        games have, or of the user's genres if the user has not inputted any games, as counted by Game.genre_count.
+        """
+        if not self.user_game_ids:
+            return (shared_genres / len(self.user_game_genres)) * self._genre_weight()
+        else:
+            return (shared_genres / len(self._user_genres)) * self._genre_weight()
+
+    def score_upper_bound(self, price_ratio_score: float) -> float:
+        """Returns an upper bound of the base score of any game that the user has not played and whose price and
+        positive ratio term is at most price_ratio_score, regardless of the game's genres.
+        """
+        if not self.user_game_ids:
+            return price_ratio_score + self._genre_weight()
+        else:
+            return price_ratio_score + self.neighbour_score() + self._genre_weight()
+
+    def _genre_weight(self) -> float:
+        """Returns the weight of the genre term of the metascore"""
+        if not self.user_game_ids:
+            return 0.4
+        else:
+            return 0.1
+
+    def _rate_price(self, game: Game, rate_price_weight: float) -> float:
+        """Returns the price and positive ratio term of the given game's metascore"""
+        max_price = self._max_price
+        if max_price in {game.price, 0.0}:
+            return game.positive_ratio / self._max_ratio
+        else:
+            return (game.positive_ratio / self._max_ratio) * ((max_price - game.price) / max_price) * rate_price_weight
+
+    def _score_game(self, game: Game) -> float:
+        """Returns the metascore of the given game in the same way as GameGraph.compute_score_game, without checking
+        the user's budget and genre requirements"""
+        neighbour_weight = 0.3
+        neighbour_ratio_weight = 0.1
+
+        if game.game_id in self._user_games:
+            # The user's games are neighbours of every other game in the graph.
+            num_neighbours = self._num_games - 1
+            neighbour_ratio = (self._total_ratio - game.positive_ratio) / num_neighbours
+            neighbour_score1 = (num_neighbours / len(self._user_games)) * neighbour_weight
+            neighbour_score2 = (neighbour_ratio / 100) * neighbour_ratio_weight
+            neighbour_score = neighbour_score1 + neighbour_score2
+        else:
+            neighbour_score = self.neighbour_score()
+
+        rate_price = self.price_ratio_score(game)
+        genre_score = self.genre_score(_genre_count(game, self._lowered_user_genres))
+
+        return rate_price + neighbour_score + genre_score
+
+    def _score_genre(self, game: Game) -> float:
+        """Returns the metascore of the given game in the same way as GameGraph.compute_score_genre, without checking
+        the user's budget"""
+        genre_score = self.genre_score(_genre_count(game, self._lowered_game_genres))
+        rate_price = self.price_ratio_score(game)
+
+        return genre_score + rate_price
+
+
+def _genre_count(game: Game, lowered_genres: set[str]) -> int:
+    """Returns the same count as game.genre_count for a collection of genres that has already been lowercased"""
+    return sum(map(lowered_genres.__contains__, map(str.lower, game.genres)))
+
+
+class AnytimeRecommendations:
+    """The recommendations that were found within a deadline.
+
+    Instance Attributes:
+    - games:
+        The recommended games in descending order of their metascore.
+    - exact:
+        Whether every candidate was scored before the deadline, i.e., whether the games are the actual top games.
+    - scored:
+        The number of candidates that were either scored or found to be ineligible before the deadline.
+    - candidates:
+        The number of candidates that could have been scored.
+
+    Representation Invariants:
+    - 0 <= self.scored <= self.candidates
+    - self.exact or self.scored < self.candidates
+    """
+    games: list[Game]
+    exact: bool
+    scored: int
+    candidates: int
+
+    def __init__(self, games: list[Game], exact: bool, scored: int, candidates: int) -> None:
+        """Initializes the recommendations"""
+        self.games = games
+        self.exact = exact
+        self.scored = scored
+        self.candidates = candidates
+
+
+class AnytimeRecommender:
+    """Recommends games from a fixed catalog within a latency deadline.
+
+    Everything that does not depend on the user, i.e., the catalog wide values of the scores and an index from each
+    tag to the games that have it, is computed once when the recommender is created, so that the deadline of every
+    recommendation is only spent on the user's candidates.
+    """
+    # Private Instance Attributes:
+    # - _catalog: The catalog that games are recommended from.
+    # - _scorer: A scorer for the catalog, which every user's scorer is derived from.
+    # - _tag_index: A mapping from each lowercased tag to the indices of the games in the catalog that have it. An
+    #   index appears once for every time that its game has the tag, just like Game.genre_count counts.
+
+    _catalog: list[Game]
+    _scorer: CatalogScorer
+    _tag_index: dict[str, list[int]]
+
+    def __init__(self, catalog: list[Game]) -> None:
+        """Initializes the recommender
+
+        Preconditions:
+        - catalog != []
+        """
+        self._catalog = catalog
+        self._scorer = CatalogScorer(catalog, [], [], float('inf'))
+        self._tag_index = {}
+        for index in range(0, len(catalog)):
+            for genre in catalog[index].genres:
+                self._tag_index.setdefault(genre.lower(), []).append(index)
+
+    def recommend(self, user_game_ids: list[int], user_game_genres: list[str], user_max_price: float, total: int,
+                  deadline: float = 0.05) -> AnytimeRecommendations:
+        """Returns the total best recommendations that can be found within deadline seconds.
+
+        The eligible candidates, i.e., the ones within the user's budget that satisfy the user's genre requirements,
+        are scored in descending order of the number of tags that they share with the user's games, or with the
+        user's genres if the user has not inputted any games, and each one is scored as soon as it comes up. The
+        ineligible candidates are never scored, since they are rated 0.0 and can only fill the spots that no eligible
+        candidate was found for. Once the deadline has passed, the best games that have been found so far are
+        returned, and the result is flagged as not exact. The deadline is only checked once enough eligible
+        candidates have been scored to fill the recommendations, so there are always min(total, number of candidates)
+        of them, and an ineligible candidate is only recommended if there are not enough eligible ones.
+
+        Like the game graph, the rating of every scored game is assigned to it.
+
+        Preconditions:
+        - user_game_ids != [] or user_game_genres != []
+        - total >= 0
+        - deadline >= 0.0
+        """
+        start = time.perf_counter()
+        scorer = self._scorer.for_user(user_game_ids, user_game_genres, user_max_price)
+        num_candidates = scorer.num_candidates()
+        enough = min(total, num_candidates)
+
+        # A min-heap of the best (rating, negated game id) pairs found so far, so that the worst one is at the top.
+        best_so_far = []
+        ineligible = []
+        scored = 0
+        for game in self._prioritized(scorer, start, deadline, enough, ineligible):
+            if scored % DEADLINE_CHECK_INTERVAL == 0 and len(best_so_far) >= enough and \
+                    time.perf_counter() - start > deadline:
+                break
+            game.rating = scorer.score(game)
+            push_bounded(best_so_far, (game.rating, -game.game_id), total)
+            scored += 1
+
+        # Every ineligible candidate is rated 0.0, so they can only fill up the remaining spots.
+        for game in ineligible:
+            game.rating = 0.0
+            push_bounded(best_so_far, (game.rating, -game.game_id), total)
+
+        found = scored + len(ineligible)
+        games = [scorer.game(-negated_id) for _, negated_id in sorted(best_so_far, reverse=True)]
+        return AnytimeRecommendations(games, found == num_candidates, found, num_candidates)
+
+    def _prioritized(self, scorer: CatalogScorer, start: float, deadline: float, enough: int,
+                     ineligible: list[Game]) -> Iterator[Game]:
+        """Yields every eligible candidate of the user once, in descending order of the number of tags that it shares
+        with the user, and appends every ineligible candidate to ineligible instead of yielding it. The tags are only
+        counted until the deadline, and any candidate whose tags have not been counted by then comes after the ones
+        that have been, in catalog order.
+
+        Each bucket of candidates that share the same number of tags is only gathered once the candidates before it
+        have been yielded, so no time is spent on the buckets that the deadline cuts off. Once the deadline has
+        passed, the search stops as soon as enough eligible candidates have been yielded to fill the recommendations,
+        even if no eligible candidate would be yielded for a while.
+        """
+        shared = collections.Counter()
+        for genre in scorer.shared_tag_genres():
+            if time.perf_counter() - start > deadline:
+                break
+            shared.update(self._tag_index.get(genre, []))
+
+        buckets = ([index for index, shared_tags in shared.items() if shared_tags == count]
+                   for count in range(max(shared.values(), default=0), 0, -1))
+        uncounted = (index for index in range(0, len(self._catalog)) if index not in shared)
+
+        found = 0
+        for position, index in enumerate(itertools.chain(itertools.chain.from_iterable(buckets), uncounted)):
+            if position % DEADLINE_CHECK_INTERVAL == 0 and found >= enough and \
+                    time.perf_counter() - start > deadline:
+                return
+            game = self._catalog[index]
+            if not scorer.is_candidate(game):
+                continue
+            if scorer.is_eligible(game):
+                found += 1
+                yield game
+            else:
+                ineligible.append(game)
+
+
+def recommend_within_deadline(catalog: list[Game], user_game_ids: list[int], user_game_genres: list[str],
+                              user_max_price: float, total: int, deadline: float = 0.05) -> AnytimeRecommendations:
+    """Returns the total best recommendations that can be found within deadline seconds, in the same way as
+    AnytimeRecommender.recommend.
+
+    The time to set up the recommender for the catalog is not counted towards the deadline. Callers that recommend
+    games from the same catalog more than once should create a single AnytimeRecommender instead.
+
+    Preconditions:
+    - catalog != []
+    - user_game_ids != [] or user_game_genres != []
+    - total >= 0
+    - deadline >= 0.0
+    """
+    return AnytimeRecommender(catalog).recommend(user_game_ids, user_game_genres, user_max_price, total, deadline)
+
+
+def push_bounded(heap: list[tuple[float, int]], entry: tuple[float, int], total: int) -> None:
+    """Pushes the (score, negated game id) entry onto the min-heap of the best entries, while keeping at most total
+    of them. Ties in the score are broken in favour of the lower game id.
+    """
+    if len(heap) < total:
+        heapq.heappush(heap, entry)
+    elif total > 0 and entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['collections', 'copy', 'heapq', 'itertools', 'time', 'game_graph'],
+        'allowed-io': [],
+        'max-line-length': 120,
+        'disable': ['forbidden-IO-function']
+    })
@@ -0,0 +1,394 @@
+"""
+CSC111 Winter 2023 Project: Steam Game Recommender
+
+This module consists of a differential harness that runs the reference scoring and ranking code in game_graph and a
+candidate recommendation engine side by side on randomized synthetic catalogs and user profiles. Any ranking or rating
+divergence between the two is reported, and the candidate fails the performance gate whenever it is slower than the
+reference on the same trials. The anytime recommendations are also checked under deadlines that cut their search
+short, where they can no longer be compared with the reference's ranking directly.
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2023 Mikhael Orteza, Muaj Ahmed, Cheng Peng, and Ari Casas Nassar
+"""
+from __future__ import annotations
+from typing import Callable, Optional
+import os
+import random
+import tempfile
+import time
+from batch_scoring import BatchScoringKernel
+from catalog_scoring import CatalogScorer, recommend_within_deadline
+from game_graph import Game, GameGraph
+from item_table import ItemTable, TableRecommender, build_item_table
+
+# An engine takes a catalog of games, the user's game ids, the user's genres, the user's maximum price and the total
+# number of games to recommend, and returns the recommended (game id, rating) pairs in descending order of rating.
+Engine = Callable[[list[Game], list[int], list[str], float, int], list[tuple[int, float]]]
+
+# The tags in games_metadata.json are lowercased, while the genres chosen in the user interface are capitalized.
+CATALOG_GENRES = ['action', 'adventure', 'rpg', 'stealth', 'puzzle', 'co-op', 'indie', 'casual', 'strategy',
+                  'simulation']
+USER_GENRES = ['Action', 'Adventure', 'RPG', 'Stealth', 'Puzzle', 'Co-op']
+
+
+class HarnessReport:
+    """The outcome of running a candidate engine through the differential harness.
+
+    Instance Attributes:
+    - trials:
+        The number of randomized catalog and user profile pairs that both engines were run on.
+    - divergences:
+        A description of every ranking or rating divergence between the reference and the candidate.
+    - reference_seconds:
+        The total time that the reference engine took over all the trials.
+    - candidate_seconds:
+        The total time that the candidate engine took over all the trials.
+    - max_ratio:
+        The highest ratio of the candidate's time to the reference's time that passes the performance gate.
+    - too_slow:
+        Whether the candidate engine took more than max_ratio times the reference's time.
+
+    Representation Invariants:
+    - self.trials >= 0
+    - self.reference_seconds >= 0.0 and self.candidate_seconds >= 0.0
+    - self.max_ratio > 0.0
+    """
+    trials: int
+    divergences: list[str]
+    reference_seconds: float
+    candidate_seconds: float
+    max_ratio: float
+    too_slow: bool
+
+    def __init__(self, trials: int, max_ratio: float) -> None:
+        """Initializes an empty report"""
+        self.trials = trials
+        self.divergences = []
+        self.reference_seconds = 0.0
+        self.candidate_seconds = 0.0
+        self.max_ratio = max_ratio
+        self.too_slow = False
+
+    def passed(self) -> bool:
+        """Returns whether the candidate engine matched the reference engine and passed the performance gate"""
+        return not self.divergences and not self.too_slow
+
+    def summary(self) -> str:
+        """Returns a human readable summary of the report"""
+        lines = [f'{self.trials} trials, {len(self.divergences)} divergences',
+                 f'reference: {self.reference_seconds:.4f}s, candidate: {self.candidate_seconds:.4f}s '
+                 f'(at most {self.max_ratio:.2f}x the reference)' + (' (too slow)' if self.too_slow else '')]
+        lines.extend(self.divergences)
+        return '\n'.join(lines)
+
+
+def random_catalog(rng: random.Random, num_games: int) -> list[Game]:
+    """Returns a randomized catalog of num_games games. The prices deliberately include free games and repeated
+    prices so that the max_price in {game.price, 0.0} edge case of the scoring is hit, and some catalogs only
+    consist of free games.
+
+    Preconditions:
+    - num_games >= 2
+    """
+    if rng.random() < 0.1:
+        prices = [0.0]
+    else:
+        prices = [0.0, 0.0, 4.99, 9.99, 19.99, 59.99] + [round(rng.uniform(0.0, 60.0), 2) for _ in range(4)]
+
+    catalog = []
+    for index in range(num_games):
+        genres = rng.sample(CATALOG_GENRES, rng.randint(1, 4))
+        catalog.append(Game((100 + index, f'Game {index}'), genres, rng.choice(prices), rng.randint(0, 100)))
+    # The highest positive ratio is used as a divisor by the scoring, so it must never be 0.
+    rng.choice(catalog).positive_ratio = rng.randint(1, 100)
+    return catalog
+
+
+def random_profile(rng: random.Random, catalog: list[Game]) -> tuple[list[int], list[str], float]:
+    """Returns a randomized (user_game_ids, user_game_genres, user_max_price) profile for the given catalog. Profiles
+    without any games always have at least one genre, since the genre based scoring requires one.
+
+    Preconditions:
+    - len(catalog) >= 2
+    """
+    num_played = rng.choice([0, 0, 1, 1, 1, 2, 3])
+    num_played = min(num_played, len(catalog) - 1)
+    user_game_ids = [game.game_id for game in rng.sample(catalog, num_played)]
+
+    min_genres = 1 if num_played == 0 else 0
+    user_game_genres = rng.sample(USER_GENRES, rng.randint(min_genres, 3))
+
+    user_max_price = rng.choice([0.0, rng.choice(catalog).price, round(rng.uniform(0.0, 60.0), 2), 100.0])
+    return user_game_ids, user_game_genres, user_max_price
+
+
+def copy_catalog(catalog: list[Game]) -> list[Game]:
+    """Returns a copy of the catalog so that one engine's mutations are never seen by another engine"""
+    return [Game((game.game_id, game.name), list(game.genres), game.price, game.positive_ratio) for game in catalog]
+
+
+def build_reference_graph(catalog: list[Game], user_game_ids: list[int], user_game_genres: list[str],
+                          user_max_price: float) -> GameGraph:
+    """Builds and scores a game graph in the same way as game_graph.generate_graph"""
+    graph = GameGraph(user_game_ids, user_game_genres, user_max_price)
+    for game in catalog:
+        graph.add_game(game)
+    graph.add_all_edges()
+    graph.assign_all_scores()
+    return graph
+
+
+def reference_engine(catalog: list[Game], user_game_ids: list[int], user_game_genres: list[str],
+                     user_max_price: float, total: int) -> list[tuple[int, float]]:
+    """The reference engine, which uses GameGraph.highest_scoring_games and, through it, sort_games"""
+    graph = build_reference_graph(catalog, user_game_ids, user_game_genres, user_max_price)
+    return [(game.game_id, game.rating) for game in graph.highest_scoring_games(total, len(catalog))]
+
+
+def cursor_engine(catalog: list[Game], user_game_ids: list[int], user_game_genres: list[str],
+                  user_max_price: float, total: int) -> list[tuple[int, float]]:
+    """A candidate engine that ranks the scored graph with GameGraph.recommendations instead"""
+    graph = build_reference_graph(catalog, user_game_ids, user_game_genres, user_max_price)
+    return [(game.game_id, game.rating) for game in graph.recommendations().next_page(total)]
+
+
+def anytime_engine(catalog: list[Game], user_game_ids: list[int], user_game_genres: list[str],
+                   user_max_price: float, total: int) -> list[tuple[int, float]]:
+    """A candidate engine that scores the catalog without a game graph, with a deadline that is never reached"""
+    result = recommend_within_deadline(catalog, user_game_ids, user_game_genres, user_max_price, total,
+                                       deadline=float('inf'))
+    return [(game.game_id, game.rating) for game in result.games]
+
+
+class TableEngine:
+    """A candidate engine that serves recommendations from an item table with short rows, so that both the table and
+    its fallback to scoring the whole catalog are exercised.
+
+    The table of a catalog is built by prepare, which the harness does not time, since the table stands for the
+    output of the offline job.
+    """
+    # Private Instance Attributes:
+    # - _table_dir: The temporary directory that the table file is written to.
+    # - _table: The opened item table of the prepared catalog, or None if no catalog has been prepared.
+    # - _recommender: The recommender that serves the prepared catalog from its table.
+
+    _table_dir: tempfile.TemporaryDirectory
+    _table: Optional[ItemTable]
+    _recommender: Optional[TableRecommender]
+
+    def __init__(self) -> None:
+        """Initializes the engine without a prepared catalog"""
+        self._table_dir = tempfile.TemporaryDirectory()
+        self._table = None
+        self._recommender = None
+
+    def prepare(self, catalog: list[Game]) -> None:
+        """Builds and opens the item table of the given catalog, which the next calls of the engine are served from"""
+        self._close_table()
+        table_file = os.path.join(self._table_dir.name, 'item_table.bin')
+        build_item_table(catalog, table_file, top_m=5, workers=1)
+        self._table = ItemTable(table_file)
+        self._recommender = TableRecommender(catalog, self._table)
+
+    def __call__(self, catalog: list[Game], user_game_ids: list[int], user_game_genres: list[str],
+                 user_max_price: float, total: int) -> list[tuple[int, float]]:
+        """Returns the recommendations of the given catalog, which must be the last one that was prepared"""
+        games = self._recommender.recommend(user_game_ids, user_game_genres, user_max_price, total)
+        return [(game.game_id, game.rating) for game in games]
+
+    def __enter__(self) -> TableEngine:
+        """Returns the engine, which is closed when the with statement ends"""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Closes the engine"""
+        self.close()
+
+    def close(self) -> None:
+        """Closes the item table and deletes its file"""
+        self._close_table()
+        self._table_dir.cleanup()
+
+    def _close_table(self) -> None:
+        """Closes the item table of the prepared catalog, if there is one"""
+        if self._table is not None:
+            self._table.close()
+            self._table = None
+            self._recommender = None
+
+
+def batch_engine(catalog: list[Game], user_game_ids: list[int], user_game_genres: list[str],
+                 user_max_price: float, total: int) -> list[tuple[int, float]]:
+    """A candidate engine that ranks the profile as a block of one with the batched scoring kernel"""
+    kernel = BatchScoringKernel(catalog)
+    return kernel.rank_block([user_game_ids], [user_game_genres], [user_max_price], total)[0]
+
+
+def compare_rankings(expected: list[tuple[int, float]], actual: list[tuple[int, float]],
+                     tolerance: float) -> list[str]:
+    """Returns a description of every divergence between the expected and the actual ranking.
+
+    The reference breaks ties between equally rated games arbitrarily, so the games within a run of tied ratings may
+    be in any order. The last run may also be cut off anywhere, so only the ratings of its games are compared.
+
+    Preconditions:
+    - tolerance >= 0.0
+    """
+    if len(expected) != len(actual):
+        return [f'expected {len(expected)} games but got {len(actual)}']
+
+    divergences = []
+    for rank in range(len(expected)):
+        if abs(expected[rank][1] - actual[rank][1]) > tolerance:
+            divergences.append(f'rank {rank + 1}: expected a rating of {expected[rank][1]} (game {expected[rank][0]}) '
+                               f'but got {actual[rank][1]} (game {actual[rank][0]})')
+
+    start = 0
+    while start < len(expected):
+        end = start + 1
+        while end < len(expected) and abs(expected[end][1] - expected[start][1]) <= tolerance:
+            end += 1
+        expected_ids = sorted(game_id for game_id, _ in expected[start:end])
+        actual_ids = sorted(game_id for game_id, _ in actual[start:end])
+        if end < len(expected) and expected_ids != actual_ids:
+            divergences.append(f'ranks {start + 1}-{end}: expected games {expected_ids} but got {actual_ids}')
+        start = end
+
+    if len({game_id for game_id, _ in actual}) != len(actual):
+        divergences.append(f'the same game was recommended more than once: {[game_id for game_id, _ in actual]}')
+    return divergences
+
+
+def run_harness(candidate: Engine, trials: int = 200, seed: int = 111, max_games: int = 60,
+                tolerance: float = 1e-9, max_ratio: float = 1.0, repeats: int = 5,
+                prepare: Optional[Callable[[list[Game]], None]] = None) -> HarnessReport:
+    """Runs the reference engine and the candidate engine on the same randomized catalogs and user profiles, and
+    returns a report of their divergences and timings.
+
+    Every trial of each engine is timed repeats times on a fresh copy of the catalog, and its fastest time is kept, so
+    that the timings are not thrown off by other processes. The candidate is too slow if its total time is more than
+    max_ratio times the total time of the reference. If prepare is given, it is called with the candidate's catalog
+    before the candidate is timed, for the offline work that the candidate relies on.
+
+    Preconditions:
+    - trials >= 0
+    - max_games >= 2
+    - tolerance >= 0.0
+    - max_ratio > 0.0
+    - repeats >= 1
+    """
+    rng = random.Random(seed)
+    report = HarnessReport(trials, max_ratio)
+
+    for trial in range(trials):
+        catalog = random_catalog(rng, rng.randint(2, max_games))
+        user_game_ids, user_game_genres, user_max_price = random_profile(rng, catalog)
+        total = rng.randint(1, len(catalog) - 1)
+
+        expected, reference_seconds = _time_engine(reference_engine, catalog, (user_game_ids, user_game_genres,
+                                                                               user_max_price, total), repeats, None)
+        actual, candidate_seconds = _time_engine(candidate, catalog, (user_game_ids, user_game_genres,
+                                                                      user_max_price, total), repeats, prepare)
+        report.reference_seconds += reference_seconds
+        report.candidate_seconds += candidate_seconds
+
+        for divergence in compare_rankings(expected, actual, tolerance):
+            report.divergences.append(f'trial {trial} (games={user_game_ids}, genres={user_game_genres}, '
+                                      f'max price={user_max_price}, total={total}): {divergence}')
+
+    report.too_slow = report.candidate_seconds > report.reference_seconds * max_ratio
+    return report
+
+
+def run_deadline_check(trials: int = 200, seed: int = 111, max_games: int = 60, deadline: float = 0.0,
+                       tolerance: float = 1e-9) -> list[str]:
+    """Runs recommend_within_deadline with a finite deadline on randomized catalogs and user profiles, and returns a
+    description of every way in which its recommendations break the guarantees of an anytime result.
+
+    The recommendations are not exact once the deadline cuts the search short, so instead of being compared with the
+    reference's ranking, they are checked to have min(total, number of candidates) games in descending order of
+    rating, each with its reference rating, and to include a game that is over the user's budget or fails the genre
+    requirements only if there are not enough games that satisfy both.
+
+    Preconditions:
+    - trials >= 0
+    - max_games >= 2
+    - deadline >= 0.0
+    - tolerance >= 0.0
+    """
+    rng = random.Random(seed)
+    divergences = []
+
+    for trial in range(trials):
+        catalog = random_catalog(rng, rng.randint(2, max_games))
+        user_game_ids, user_game_genres, user_max_price = random_profile(rng, catalog)
+        total = rng.randint(1, len(catalog) - 1)
+
+        graph = build_reference_graph(copy_catalog(catalog), user_game_ids, user_game_genres, user_max_price)
+        ratings = {game.game_id: game.rating for game in graph.recommendations().next_page(len(catalog))}
+        scorer = CatalogScorer(catalog, user_game_ids, user_game_genres, user_max_price)
+        eligible_ids = {game.game_id for game in catalog if game.game_id in ratings and scorer.is_eligible(game)}
+        result = recommend_within_deadline(copy_catalog(catalog), user_game_ids, user_game_genres, user_max_price,
+                                           total, deadline)
+        actual = [(game.game_id, game.rating) for game in result.games]
+
+        problems = []
+        if len(actual) != min(total, len(ratings)):
+            problems.append(f'{len(actual)} games were recommended instead of {min(total, len(ratings))}')
+        if sum(1 for game_id, _ in actual if game_id in eligible_ids) != min(len(actual), len(eligible_ids)):
+            problems.append(f'ineligible games were recommended although {len(eligible_ids)} games are eligible: '
+                            f'{actual}')
+        for game_id, rating in actual:
+            if game_id not in ratings or abs(ratings[game_id] - rating) > tolerance:
+                problems.append(f'game {game_id} was rated {rating} instead of {ratings.get(game_id)}')
+        if any(actual[i][1] < actual[i + 1][1] for i in range(len(actual) - 1)):
+            problems.append(f'the games are not in descending order of rating: {actual}')
+        for problem in problems:
+            divergences.append(f'trial {trial} (games={user_game_ids}, genres={user_game_genres}, '
+                               f'max price={user_max_price}, total={total}, deadline={deadline}): {problem}')
+
+    return divergences
+
+
+def _time_engine(engine: Engine, catalog: list[Game], profile: tuple[list[int], list[str], float, int], repeats: int,
+                 prepare: Optional[Callable[[list[Game]], None]]) -> tuple[list[tuple[int, float]], float]:
+    """Returns the ranking that the engine gives for the profile on a copy of the catalog, along with the fastest of
+    repeats timed runs"""
+    fastest = float('inf')
+    ranking = []
+    for _ in range(repeats):
+        engine_catalog = copy_catalog(catalog)
+        if prepare is not None:
+            prepare(engine_catalog)
+        start = time.perf_counter()
+        ranking = engine(engine_catalog, *profile)
+        fastest = min(fastest, time.perf_counter() - start)
+    return ranking, fastest
+
+
+if __name__ == '__main__':
+    all_passed = True
+    with TableEngine() as table_engine:
+        for name, engine, engine_prepare in [('cursor_engine', cursor_engine, None),
+                                             ('anytime_engine', anytime_engine, None),
+                                             ('table_engine', table_engine, table_engine.prepare),
+                                             ('batch_engine', batch_engine, None)]:
+            harness_report = run_harness(engine, prepare=engine_prepare)
+            print(f'{name}: {harness_report.summary()}')
+            all_passed = all_passed and harness_report.passed()
+    # A deadline of 0.0 cuts off the tag counting, while a large catalog lets a short deadline cut off the scoring.
+    for deadline_trials, deadline_max_games, check_deadline in [(200, 60, 0.0), (20, 5000, 0.001)]:
+        deadline_divergences = run_deadline_check(deadline_trials, max_games=deadline_max_games,
+                                                  deadline=check_deadline)
+        print(f'anytime deadline of {check_deadline}s: {deadline_trials} trials, '
+              f'{len(deadline_divergences)} divergences')
+        for deadline_divergence in deadline_divergences:
+            print(deadline_divergence)
+        all_passed = all_passed and not deadline_divergences
+    if not all_passed:
+        raise SystemExit(1)
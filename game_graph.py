@@ -16,8 +16,8 @@ This file is Copyright (c) 2023 Mikhael Orteza, Muaj Ahmed, Cheng Peng, and Ari
 from __future__ import annotations
 from typing import Optional
 import csv
+import heapq
 import json
-import user_interface
 
 
 class Game:
@@ -152,6 +152,22 @@ class GameGraph:
                 if user_node != other_node and (user_node not in other_node.neighbours):
                     self.add_edge(other_node, user_node)
 
+    def get_nodes(self) -> list[GameNode]:
+        """Returns all the nodes in the graph, in the order that their games were added"""
+        return [self._nodes[game_id] for game_id in self._nodes]
+
+    def get_user_nodes(self) -> list[GameNode]:
+        """Returns the nodes whose game has been played by the user, in the order that their games were added"""
+        return [self._user_nodes[game_id] for game_id in self._user_nodes]
+
+    def get_node(self, game_id: int) -> GameNode:
+        """Returns the node of the game with the given id
+
+        Preconditions:
+        - game_id in self._nodes
+        """
+        return self._nodes[game_id]
+
     def add_edge(self, game1: GameNode, user_node: GameNode) -> None:
         """Creates an edge between two game nodes.
         Preconditions:
@@ -322,6 +338,73 @@ class GameGraph:
             # When the user has not inputted any games, i.e., self.user_game_ids == []
             return self.top_games(total_games)
 
+    def recommendations(self) -> RecommendationCursor:
+        """Returns a cursor that lazily yields the recommended games in descending order of their score. Unlike
+        highest_scoring_games, the number of recommendations does not need to be known in advance, so more
+        recommendations can be requested later on without recomputing the ones that have already been given.
+
+        Preconditions:
+        - self.assign_all_scores() has been called
+        """
+        possible_suggestions = set()
+
+        for game_id in self._user_nodes:
+            for neighbour in self._user_nodes[game_id].neighbours:
+                possible_suggestions.add(neighbour.game)
+
+        if possible_suggestions != set():
+            user_games = {self._user_nodes[game_id].game for game_id in self._user_nodes}
+            return RecommendationCursor([game for game in possible_suggestions if game not in user_games])
+        else:
+            # When the user has not inputted any games, i.e., self.user_game_ids == []
+            return RecommendationCursor([self._nodes[game_id].game for game_id in self._nodes])
+
+
+class RecommendationCursor:
+    """A cursor over the scored games of a game graph that yields the recommended games in descending order of their
+    score on demand. The heap of candidates is only built once, so every further page of recommendations only costs
+    O(page_size * log(n)) instead of recomputing the whole ranking.
+
+    Representation Invariants:
+    - all(entry[2].rating is not None for entry in self._heap)
+    """
+    # Private Instance Attributes:
+    # - _heap: A min-heap of (negated rating, game id, game) tuples so that the highest scoring game is at the top.
+    #   Ties in the rating are broken by the game id, so the game objects themselves are never compared.
+
+    _heap: list[tuple[float, int, Game]]
+
+    def __init__(self, games: list[Game]) -> None:
+        """Initializes the cursor by heapifying the given scored games in O(n) time"""
+        self._heap = [(-game.rating, game.game_id, game) for game in games]
+        heapq.heapify(self._heap)
+
+    def __iter__(self) -> RecommendationCursor:
+        """Returns the cursor itself, which allows it to be used in a for loop"""
+        return self
+
+    def __next__(self) -> Game:
+        """Returns the next highest scoring game that has not been returned yet"""
+        if not self._heap:
+            raise StopIteration
+        return heapq.heappop(self._heap)[2]
+
+    def next_page(self, page_size: int) -> list[Game]:
+        """Returns the next page_size highest scoring games in descending order of their score. Fewer games are
+        returned if the cursor runs out of games.
+
+        Preconditions:
+        - page_size >= 0
+        """
+        page = []
+        while self._heap and len(page) < page_size:
+            page.append(heapq.heappop(self._heap)[2])
+        return page
+
+    def remaining(self) -> int:
+        """Returns the number of games that have not been returned yet"""
+        return len(self._heap)
+
 
 def read_data_csv(csv_file: str, total_rows: int) -> dict[int, Game]:
     """Load data from a CSV file and output the data as a mapping between game ids and their corresponding Game object.
@@ -338,19 +421,28 @@ def read_data_csv(csv_file: str, total_rows: int) -> dict[int, Game]:
         rows_so_far = 0
         for row in reader:
             if rows_so_far <= total_rows:
-                game_id = int(row[0])
-                name = row[1]
-                genres = []
-                # 6 is skipped for rating(all words)
-                positive_ratio = int(row[7])
-                # 8 is skipped for user_reviews
-                price_final = float(row[9])
-                curr_game = Game((game_id, name), genres, price_final, positive_ratio)
-                result[game_id] = curr_game
+                curr_game = game_from_row(row)
+                result[curr_game.game_id] = curr_game
                 rows_so_far += 1
     return result
 
 
+def game_from_row(row: list[str]) -> Game:
+    """Returns the game described by a row of the games CSV file, without any genres.
+
+    Preconditions:
+    - row is a row of a valid CSV file, meaning that it consists of all the characteristics of a steam game.
+    """
+    game_id = int(row[0])
+    name = row[1]
+    genres = []
+    # 6 is skipped for rating(all words)
+    positive_ratio = int(row[7])
+    # 8 is skipped for user_reviews
+    price_final = float(row[9])
+    return Game((game_id, name), genres, price_final, positive_ratio)
+
+
 def read_metadata_json(json_file: str) -> list[tuple]:
     """Load data from a JSON file and output the data as a list of tuples. The tuple contains the game_id(index 0, int)
     and the tags(index 1, list[str]).
@@ -361,20 +453,28 @@ def read_metadata_json(json_file: str) -> list[tuple]:
     result = []
 
     with open(json_file, encoding='utf-8') as f:
-        for line1 in [str.strip(line2.lower()) for line2 in f]:
-            curr_full_metadata = json.loads(line1)
-            relevant_metadata = (int(curr_full_metadata.get('app_id')), curr_full_metadata.get('tags'))
-            result.append(relevant_metadata)
+        for line in f.readlines():
+            result.append(metadata_from_line(line))
     return result
 
 
-def generate_graph(game_file: str, json_file: str, user_info: tuple, max_price: float, total_nodes: int) -> GameGraph:
-    """Creates a game graph
+def metadata_from_line(line: str) -> tuple:
+    """Returns the (game_id, tags) tuple of a line of the metadata JSON file, in the same way as read_metadata_json.
+
+    Preconditions:
+    - line is a line of a valid JSON file in terms of its format, meaning that it consists of the game id, description,
+    and genres of a game.
+    """
+    curr_full_metadata = json.loads(str.strip(line.lower()))
+    return int(curr_full_metadata.get('app_id')), curr_full_metadata.get('tags')
+
+
+def load_catalog(game_file: str, json_file: str, total_nodes: int) -> list[Game]:
+    """Returns the first total_nodes games of the datasets along with their genres, in the order that they are added
+    to the game graph by generate_graph.
     Preconditions:
     -game_file refers to a csv file consisting of games and their attributes.
     -json_file is a json file that consists of the every game's genre in.
-    -user_games refers to a list of games that the user has inputted.
-    -len(user_info) == 2
     -total_nodes >= 0
     -total_nodes <= 46068
     """
@@ -383,11 +483,39 @@ def generate_graph(game_file: str, json_file: str, user_info: tuple, max_price:
 
     json_result = read_metadata_json(json_file)
     csv_result = read_data_csv(game_file, total_nodes)
-    game_graph = GameGraph(user_info[0], user_info[1], max_price)
+    return join_catalog(csv_result, json_result, total_nodes)
+
+
+def join_catalog(csv_result: dict[int, Game], json_result: list[tuple], total_nodes: int) -> list[Game]:
+    """Returns the first total_nodes games of the loaded metadata, with the genres from the metadata assigned to the
+    games loaded from the CSV file.
+
+    Preconditions:
+    - csv_result and json_result are the results of read_data_csv(game_file, total_nodes) and
+      read_metadata_json(json_file), or of equivalent loaders
+    - total_nodes <= len(json_result)
+    """
+    catalog = []
     for index in range(0, total_nodes):
         metadata = json_result[index]
         game = csv_result[metadata[0]]
         game.genres = metadata[1]
+        catalog.append(game)
+    return catalog
+
+
+def generate_graph(game_file: str, json_file: str, user_info: tuple, max_price: float, total_nodes: int) -> GameGraph:
+    """Creates a game graph
+    Preconditions:
+    -game_file refers to a csv file consisting of games and their attributes.
+    -json_file is a json file that consists of the every game's genre in.
+    -user_games refers to a list of games that the user has inputted.
+    -len(user_info) == 2
+    -total_nodes >= 0
+    -total_nodes <= 46068
+    """
+    game_graph = GameGraph(user_info[0], user_info[1], max_price)
+    for game in load_catalog(game_file, json_file, total_nodes):
         game_graph.add_game(game)
 
     # Creates edges between each node if applicable.
@@ -430,46 +558,11 @@ def highest_scoring_game(game_list: set[Game]) -> Optional[Game]:
     return game_so_far
 
 
-def runner(game_file: str, game_metadata_file: str) -> None:
-    """Run a simulation based on the data from the given csv file."""
-    total_nodes = 5000  # Maximum number of nodes allowed is 46068, note that as this number goes up, the program
-    # will take a longer time to run
-
-    # Part 1: Read datasets
-    games = read_data_csv(game_file, total_nodes)
-    valid_ids = list(games)  # List of all the game ids only
-
-    # Part 2: Tkinter interface(ask for preferred genres)
-
-    # Call the GameIDSelector class
-    id_selector = user_interface.GameIDSelector(games, valid_ids)
-    game_ids = id_selector.get_game_ids()
-
-    # Call the GenreSelector class
-    genre_selector = user_interface.GenreSelector()
-    selected_genres = genre_selector.genres
-
-    # Call the MaxPrice class
-    input_price = user_interface.MaxPrice()
-    max_price = input_price.price
-
-    # Part 3: Build graph and compute scores
-    game_graph = generate_graph(game_file, game_metadata_file, (game_ids, selected_genres), max_price, total_nodes)
-
-    # Part 4: Give recommendations
-    num_games_recommended = 5  # This can be changed but must always be at least  less than or equal to total_nodes
-
-    # Note: the returned list of games are in sorted order in terms of score
-    top_games = game_graph.highest_scoring_games(num_games_recommended, total_nodes)
-    # Call the GameRecommendations class
-    user_interface.GameRecommendations(top_games)
-
-
 if __name__ == '__main__':
     import python_ta
 
     python_ta.check_all(config={
-        'extra-imports': ['tkinter', 'csv', 'json', 'user_interface'],
+        'extra-imports': ['csv', 'heapq', 'json'],
         'allowed-io': [],
         'max-line-length': 120,
         'disable': ['forbidden-IO-function']
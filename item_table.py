@@ -0,0 +1,313 @@
+"""
+CSC111 Winter 2023 Project: Steam Game Recommender
+
+This module consists of the offline job that precomputes the "players of this game also like" recommendations of
+every game in the catalog, and of the memory-mapped table that serves them.
+
+For every game, the table stores the ids and base scores of the top games that would be recommended to a user who
+has only played that game, before the user's budget and genre requirements are applied. Each row has a fixed width,
+so the row of a game is found with a single seek. Queries for a single played game are served from its row, and only
+fall back to scoring the whole catalog when the row cannot prove that it contains the top games.
+
+The table file consists of a header, the ids of the games in row order, and then one row per game. Each row holds
+top_m (game id, base score) entries in descending order of their score, padded with entries whose id is EMPTY_ID.
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2023 Mikhael Orteza, Muaj Ahmed, Cheng Peng, and Ari Casas Nassar
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+import heapq
+import mmap
+import struct
+from catalog_scoring import AnytimeRecommender, CatalogScorer, push_bounded
+from game_graph import Game, load_catalog
+
+TABLE_MAGIC = b'GGIT'
+TABLE_VERSION = 1
+# The magic bytes, the version, the number of games and the number of entries in each row.
+HEADER = struct.Struct('<4sIII')
+GAME_ID = struct.Struct('<q')
+# The id of a recommended game and its base score.
+ENTRY = struct.Struct('<qd')
+EMPTY_ID = -1
+
+# The number of games whose rows are computed by a worker process at a time.
+CHUNK_SIZE = 256
+# Scores that are computed in different ways may differ by rounding errors of this size.
+BOUND_TOLERANCE = 1e-9
+
+# The state of a worker process of build_item_table, which is set up once by _init_worker.
+_worker_state = {}
+
+
+def played_game_row(scorer: CatalogScorer, ranked: list[Game], game: Game, top_m: int) -> list[tuple[int, float]]:
+    """Returns the ids and base scores of the top_m games that would be recommended to a user who has only played the
+    given game, in descending order of their score. Ties are broken in favour of the lower game id.
+
+    The games are scanned in descending order of their price and positive ratio term, and the scan stops as soon as
+    no remaining game can beat the worst of the top_m games found so far, whatever its genres are.
+
+    Preconditions:
+    - ranked contains every game of the scorer's catalog in descending order of scorer.price_ratio_score
+    - top_m >= 0
+    """
+    player_scorer = scorer.for_user([game.game_id], [], float('inf'))
+    # A min-heap of the best (base score, negated game id) pairs found so far.
+    best_so_far = []
+
+    for other in ranked:
+        if len(best_so_far) == top_m and \
+                player_scorer.score_upper_bound(player_scorer.price_ratio_score(other)) < best_so_far[0][0]:
+            break
+        if other.game_id != game.game_id:
+            push_bounded(best_so_far, (player_scorer.base_score(other), -other.game_id), top_m)
+
+    return [(-negated_id, score) for score, negated_id in sorted(best_so_far, reverse=True)]
+
+
+def build_item_table(catalog: list[Game], table_file: str, top_m: int = 50, workers: Optional[int] = None) -> None:
+    """Computes the row of every game in the catalog in parallel and writes the table to table_file.
+
+    The rows are computed by workers processes, or by as many processes as there are cores if workers is None.
+    If workers is 1, the rows are computed in this process instead.
+
+    Preconditions:
+    - catalog != []
+    - all game ids in the catalog are unique
+    - top_m > 0
+    - workers is None or workers >= 1
+    """
+    chunks = [range(start, min(start + CHUNK_SIZE, len(catalog))) for start in range(0, len(catalog), CHUNK_SIZE)]
+
+    with open(table_file, 'wb') as f:
+        f.write(HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(catalog), top_m))
+        f.write(b''.join(GAME_ID.pack(game.game_id) for game in catalog))
+
+        if workers == 1:
+            _init_worker(catalog, top_m)
+            _write_rows(f, map(_compute_rows, chunks), top_m)
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(catalog, top_m)) as executor:
+                _write_rows(f, executor.map(_compute_rows, chunks), top_m)
+
+
+def run_offline_job(game_file: str, json_file: str, table_file: str, total_nodes: int = 46068, top_m: int = 50,
+                    workers: Optional[int] = None) -> None:
+    """Loads the first total_nodes games of the datasets and builds their item table in table_file.
+
+    Preconditions:
+    - game_file refers to a csv file consisting of games and their attributes.
+    - json_file is a json file that consists of the every game's genre in.
+    - 0 < total_nodes <= 46068
+    - top_m > 0
+    """
+    build_item_table(load_catalog(game_file, json_file, total_nodes), table_file, top_m, workers)
+
+
+def _init_worker(catalog: list[Game], top_m: int) -> None:
+    """Sets up the scorer and the scan order that are shared by every row that the worker process computes"""
+    scorer = CatalogScorer(catalog, [], [], float('inf'))
+    # The price and positive ratio term does not depend on which game the user has played, so every row scans the
+    # catalog in the same order.
+    any_player_scorer = scorer.for_user([catalog[0].game_id], [], float('inf'))
+    _worker_state['catalog'] = catalog
+    _worker_state['scorer'] = scorer
+    _worker_state['ranked'] = sorted(catalog, key=any_player_scorer.price_ratio_score, reverse=True)
+    _worker_state['top_m'] = top_m
+
+
+def _compute_rows(indices: range) -> list[list[tuple[int, float]]]:
+    """Returns the rows of the games at the given indices of the catalog"""
+    catalog = _worker_state['catalog']
+    return [played_game_row(_worker_state['scorer'], _worker_state['ranked'], catalog[index], _worker_state['top_m'])
+            for index in indices]
+
+
+def _write_rows(f, chunks_of_rows: Iterable[list[list[tuple[int, float]]]], top_m: int) -> None:
+    """Writes every row, in order, to the end of the table file f"""
+    padding = ENTRY.pack(EMPTY_ID, 0.0)
+    for rows in chunks_of_rows:
+        for row in rows:
+            f.write(b''.join(ENTRY.pack(game_id, score) for game_id, score in row))
+            f.write(padding * (top_m - len(row)))
+
+
+class ItemTable:
+    """A table of the precomputed recommendations for players of each game, which is memory-mapped from a table file.
+
+    Instance Attributes:
+    - top_m:
+        The number of recommendations that are stored for every game.
+
+    Representation Invariants:
+    - self.top_m > 0
+    """
+    # Private Instance Attributes:
+    # - _file: The opened table file.
+    # - _map: The memory map of the table file.
+    # - _rows: A mapping from game ids to the index of their row in the table.
+    # - _rows_offset: The position of the first row in the table file.
+
+    top_m: int
+    _map: mmap.mmap
+    _rows: dict[int, int]
+    _rows_offset: int
+
+    def __init__(self, table_file: str) -> None:
+        """Opens and memory-maps the given table file
+
+        Raises a ValueError if the file is not an item table, in which case it is closed again.
+        """
+        self._file = open(table_file, 'rb')
+        try:
+            # An empty file cannot be memory-mapped, and a file that is too short cannot be unpacked.
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as error:
+            self._file.close()
+            raise ValueError(f"{table_file} is not a version {TABLE_VERSION} item table.") from error
+
+        game_ids = None
+        try:
+            magic, version, num_games, self.top_m = HEADER.unpack_from(self._map, 0)
+            if magic == TABLE_MAGIC and version == TABLE_VERSION:
+                game_ids = struct.unpack_from(f'<{num_games}q', self._map, HEADER.size)
+        except struct.error:
+            pass
+        if game_ids is None:
+            self.close()
+            raise ValueError(f"{table_file} is not a version {TABLE_VERSION} item table.")
+
+        self._rows = {game_id: row for row, game_id in enumerate(game_ids)}
+        self._rows_offset = HEADER.size + num_games * GAME_ID.size
+
+    def __enter__(self) -> ItemTable:
+        """Returns the table, which is closed when the with statement ends"""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Closes the table"""
+        self.close()
+
+    def __contains__(self, game_id: int) -> bool:
+        """Returns whether the table has a row for the given game id"""
+        return game_id in self._rows
+
+    def row(self, game_id: int) -> list[tuple[int, float]]:
+        """Returns the precomputed (game id, base score) recommendations for players of the given game, in descending
+        order of their score. A row with fewer than top_m entries contains every game of the catalog but the given one.
+
+        Preconditions:
+        - game_id in self
+        """
+        row_size = self.top_m * ENTRY.size
+        start = self._rows_offset + self._rows[game_id] * row_size
+        row = []
+        for recommended_id, score in ENTRY.iter_unpack(self._map[start:start + row_size]):
+            if recommended_id == EMPTY_ID:
+                break
+            row.append((recommended_id, score))
+        return row
+
+    def close(self) -> None:
+        """Closes the memory map and the table file"""
+        self._map.close()
+        self._file.close()
+
+
+class TableRecommender:
+    """Recommends games from the precomputed rows of an item table, and only scores the whole catalog when the row of
+    the user's game cannot prove which games are the top ones, or when the user has not played exactly one game.
+
+    Instance Attributes:
+    - table_hits:
+        The number of recommendations that were served from the table.
+    - fallbacks:
+        The number of recommendations that had to score the whole catalog.
+
+    Representation Invariants:
+    - self.table_hits >= 0 and self.fallbacks >= 0
+    """
+    # Private Instance Attributes:
+    # - _table: The item table.
+    # - _scorer: A scorer for the catalog, which is reused for every user.
+    # - _fallback_recommender: The recommender that scores the whole catalog when the table cannot be used.
+
+    table_hits: int
+    fallbacks: int
+    _table: ItemTable
+    _scorer: CatalogScorer
+    _fallback_recommender: AnytimeRecommender
+
+    def __init__(self, catalog: list[Game], table: ItemTable) -> None:
+        """Initializes the recommender
+
+        Preconditions:
+        - table was built from catalog
+        """
+        self.table_hits = 0
+        self.fallbacks = 0
+        self._table = table
+        self._scorer = CatalogScorer(catalog, [], [], float('inf'))
+        self._fallback_recommender = AnytimeRecommender(catalog)
+
+    def recommend(self, user_game_ids: list[int], user_game_genres: list[str], user_max_price: float,
+                  total: int) -> list[Game]:
+        """Returns the total top recommended games in descending order of their metascore, which is assigned to them.
+
+        If the user has played a single game, the games in its row are scored, and any game outside of the row scores
+        at most the last game in it. If the total best games in the row reach that score, they are the top games.
+
+        Every other user is recommended games by scoring the whole catalog. The rows are ranked without the user's
+        genre requirements, which a game outside of the rows of several played games can meet while most of the games
+        in the rows do not, so the rows of several games can almost never prove which games are the top ones.
+
+        Preconditions:
+        - user_game_ids != [] or user_game_genres != []
+        - total >= 0
+        """
+        played_ids = [game_id for game_id in dict.fromkeys(user_game_ids) if game_id in self._table]
+        if len(played_ids) != 1:
+            return self._fallback(user_game_ids, user_game_genres, user_max_price, total)
+
+        scorer = self._scorer.for_user(user_game_ids, user_game_genres, user_max_price)
+        row = self._table.row(played_ids[0])
+        eligible = []
+        for recommended_id, _ in row:
+            game = self._scorer.game(recommended_id)
+            if scorer.is_eligible(game):
+                game.rating = scorer.base_score(game)
+                eligible.append(game)
+        top_games = heapq.nsmallest(total, eligible, key=lambda game: (-game.rating, game.game_id))
+
+        # A row with fewer than top_m entries contains every other game, so there are no games outside of it.
+        bound = row[-1][1] if len(row) == self._table.top_m else float('-inf')
+        if len(top_games) == total and (total == 0 or top_games[-1].rating >= bound + BOUND_TOLERANCE):
+            self.table_hits += 1
+            return top_games
+        else:
+            return self._fallback(user_game_ids, user_game_genres, user_max_price, total)
+
+    def _fallback(self, user_game_ids: list[int], user_game_genres: list[str], user_max_price: float,
+                  total: int) -> list[Game]:
+        """Returns the total top recommended games by scoring the whole catalog"""
+        self.fallbacks += 1
+        return self._fallback_recommender.recommend(user_game_ids, user_game_genres, user_max_price, total,
+                                                    deadline=float('inf')).games
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['concurrent.futures', 'heapq', 'mmap', 'struct', 'catalog_scoring', 'game_graph'],
+        'allowed-io': [],
+        'max-line-length': 120,
+        'disable': ['forbidden-IO-function']
+    })
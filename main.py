@@ -1,7 +1,8 @@
 """
 CSC111 Winter 2023 Project: Steam Game Recommender
 
-This module is the main module used to run the program.
+This module is the main module used to run the program. It is the only module that loads the tkinter user interface,
+so the recommender core in game_graph can be imported by batch jobs on hosts without tkinter.
 
 This file is provided solely for the personal and private use of students
 taking CSC111 at the University of Toronto St. George campus. All forms of
@@ -16,13 +17,54 @@ import game_graph
 
 
 # To change the number of games recommended, please look at changing the num_games_recommended variable under
-# the runner function in game_graph.py
+# the runner function below
+
+def runner(game_file: str, game_metadata_file: str) -> None:
+    """Run a simulation based on the data from the given csv file."""
+    # The user interface is only imported here, since importing it loads tkinter.
+    import user_interface
+
+    total_nodes = 5000  # Maximum number of nodes allowed is 46068, note that as this number goes up, the program
+    # will take a longer time to run
+
+    # Part 1: Read datasets
+    games = game_graph.read_data_csv(game_file, total_nodes)
+    valid_ids = list(games)  # List of all the game ids only
+
+    # Part 2: Tkinter interface(ask for preferred genres)
+
+    # Call the GameIDSelector class
+    id_selector = user_interface.GameIDSelector(games, valid_ids)
+    game_ids = id_selector.get_game_ids()
+
+    # Call the GenreSelector class
+    genre_selector = user_interface.GenreSelector()
+    selected_genres = genre_selector.genres
+
+    # Call the MaxPrice class
+    input_price = user_interface.MaxPrice()
+    max_price = input_price.price
+
+    # Part 3: Build graph and compute scores
+    graph = game_graph.generate_graph(game_file, game_metadata_file, (game_ids, selected_genres), max_price,
+                                      total_nodes)
+
+    # Part 4: Give recommendations
+    num_games_recommended = 5  # The number of games shown at first and loaded every time the user scrolls down
+
+    # Note: the returned games are in sorted order in terms of score, and more of them are loaded from the cursor
+    # whenever the user scrolls to the bottom of the recommendations
+    recommendations = graph.recommendations()
+    top_games = recommendations.next_page(num_games_recommended)
+    # Call the GameRecommendations class
+    user_interface.GameRecommendations(top_games, recommendations)
+
 
 def run() -> None:
     """Run the program."""
     game_file = 'datasets/games.csv'
     game_metadata_file = 'datasets/games_metadata.json'
-    game_graph.runner(game_file, game_metadata_file)
+    runner(game_file, game_metadata_file)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,608 @@
+"""
+CSC111 Winter 2023 Project: Steam Game Recommender
+
+This module consists of the memory accounting of game graph builds, and of a budgeted build mode for memory-limited
+containers.
+
+The bytes used by the catalog (the Game objects), the tag data (the genres of the games and the metadata that they are
+loaded from), the adjacency (the GameNode objects and their neighbour lists) and the scores are estimated before a
+build, and measured at each stage of it. Given a byte budget, the build uses the first of these strategies that is
+estimated to fit within the budget:
+- full: the same build as generate_graph.
+- drop_descriptions: the metadata file is streamed so that the descriptions are never held in memory, the tags are
+  interned so that every tag string is only stored once, and an already loaded catalog is reused instead of parsing the
+  CSV file a second time. The graph is identical to the full build.
+- share_neighbours: like drop_descriptions, but every game that the user has not played shares a single tuple of the
+  user's games as its neighbours, instead of each of them holding its own list of the same games. The graph is still
+  equivalent to the full build.
+- spill_adjacency: like share_neighbours, but the neighbour lists of the user's games, which hold every other game,
+  are spilled to temporary files on disk. The graph is still equivalent to the full build.
+- cap_neighbours: like share_neighbours, but the neighbour lists of the user's games are capped to the games with the
+  highest scores. Only the recommendations within the cap are guaranteed to be the same as the full build's.
+
+No strategy degrades the Game objects, their tags or the graph's nodes, which take up most of the memory of the
+degraded builds, so the most degraded build only uses moderately less memory than drop_descriptions.
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2023 Mikhael Orteza, Muaj Ahmed, Cheng Peng, and Ari Casas Nassar
+"""
+from __future__ import annotations
+from array import array
+from itertools import islice
+from typing import BinaryIO, Iterator, Optional
+import csv
+import heapq
+import io
+import os
+import sys
+import tempfile
+import weakref
+from game_graph import Game, GameGraph, GameNode, game_from_row, join_catalog, metadata_from_line, read_data_csv, \
+    read_metadata_json
+
+STRATEGIES = ['full', 'drop_descriptions', 'share_neighbours', 'spill_adjacency', 'cap_neighbours']
+STAGES = ['load', 'edges', 'scores']
+COMPONENTS = ['catalog', 'tags', 'metadata', 'adjacency', 'scores']
+
+# The number of game ids that a spilled neighbour list buffers in memory before writing them to disk.
+SPILL_BUFFER_SIZE = 1024
+# The size of a pointer, and of a game id in a spilled neighbour list.
+POINTER_BYTES = 8
+# The number of games that are sampled from the datasets to estimate the size of a build.
+SAMPLE_SIZE = 200
+
+
+class MemoryReport:
+    """The number of bytes that are used by each component of a game graph build at each of its stages.
+
+    Instance Attributes:
+    - stages:
+        A mapping from the name of each stage, in order, to a mapping from each component to the bytes it uses.
+
+    Representation Invariants:
+    - all(stage in STAGES for stage in self.stages)
+    - all(all(num_bytes >= 0 for num_bytes in self.stages[stage].values()) for stage in self.stages)
+    """
+    stages: dict[str, dict[str, int]]
+
+    def __init__(self) -> None:
+        """Initializes an empty report"""
+        self.stages = {}
+
+    def record(self, stage: str, component: str, num_bytes: int) -> None:
+        """Records that the given component uses num_bytes bytes during the given stage
+
+        Preconditions:
+        - stage in STAGES
+        - component in COMPONENTS
+        """
+        self.stages.setdefault(stage, {})[component] = num_bytes
+
+    def stage_total(self, stage: str) -> int:
+        """Returns the total number of bytes that are used during the given stage"""
+        return sum(self.stages.get(stage, {}).values())
+
+    def peak(self) -> int:
+        """Returns the highest number of bytes that are used during any stage"""
+        return max((self.stage_total(stage) for stage in self.stages), default=0)
+
+    def summary(self) -> str:
+        """Returns a human readable summary of the report"""
+        lines = []
+        for stage in self.stages:
+            components = ', '.join(f'{component} {_format_bytes(num_bytes)}'
+                                   for component, num_bytes in self.stages[stage].items())
+            lines.append(f'{stage}: {_format_bytes(self.stage_total(stage))} ({components})')
+        return '\n'.join(lines)
+
+
+class BuildResult:
+    """The outcome of a budgeted game graph build.
+
+    Instance Attributes:
+    - graph:
+        The built and scored game graph.
+    - strategy:
+        The strategy that the graph was built with, which is one of STRATEGIES.
+    - byte_budget:
+        The number of bytes that the build had to fit within.
+    - estimates:
+        A mapping from each strategy that was considered, in order, to its estimated peak number of bytes.
+    - estimated:
+        The estimated memory report of the chosen strategy.
+    - measured:
+        The memory report that was measured at the end of each stage of the build.
+    - exact_recommendations:
+        The number of top recommendations that are guaranteed to be the same as the ones of a full build, or None if
+        all of them are.
+    - smallest_peak:
+        The estimated peak number of bytes of the most degraded build, below which no budget can be met.
+
+    Representation Invariants:
+    - self.strategy in STRATEGIES
+    - self.strategy in self.estimates
+    - self.exact_recommendations is None or self.strategy == 'cap_neighbours'
+    """
+    graph: GameGraph
+    strategy: str
+    byte_budget: int
+    estimates: dict[str, int]
+    estimated: MemoryReport
+    measured: MemoryReport
+    exact_recommendations: Optional[int]
+    smallest_peak: int
+
+    def __init__(self, graph: GameGraph, strategy: str, byte_budget: int, estimates: dict[str, int],
+                 estimated: MemoryReport, measured: MemoryReport, exact_recommendations: Optional[int],
+                 smallest_peak: int) -> None:
+        """Initializes the build result"""
+        self.graph = graph
+        self.strategy = strategy
+        self.byte_budget = byte_budget
+        self.estimates = estimates
+        self.estimated = estimated
+        self.measured = measured
+        self.exact_recommendations = exact_recommendations
+        self.smallest_peak = smallest_peak
+
+    def __enter__(self) -> BuildResult:
+        """Returns the build result, which is closed when the with statement ends"""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Closes the build result"""
+        self.close()
+
+    def close(self) -> None:
+        """Deletes the temporary files of the graph's spilled neighbour lists, if there are any. They are also deleted
+        as soon as the graph is dropped. The graph's recommendations cannot be computed once they are deleted."""
+        for user_node in self.graph.get_user_nodes():
+            if isinstance(user_node.neighbours, SpilledNeighbourList):
+                user_node.neighbours.close()
+
+    def summary(self) -> str:
+        """Returns a human readable summary of the build"""
+        lines = [f'strategy: {self.strategy} (budget {_format_bytes(self.byte_budget)})']
+        for strategy in self.estimates:
+            lines.append(f'estimated peak of {strategy}: {_format_bytes(self.estimates[strategy])}')
+        if self.exact_recommendations is not None:
+            lines.append(f'only the top {self.exact_recommendations} recommendations are exact')
+        lines.append(f'smallest estimated peak of any strategy: {_format_bytes(self.smallest_peak)} (the games, their '
+                     f'tags and the graph\'s nodes are never degraded)')
+        lines.append('measured:')
+        lines.append(self.measured.summary())
+        return '\n'.join(lines)
+
+
+class SpilledNeighbourList:
+    """A list of the neighbours of a game node that is stored on disk, as the ids of the neighbours' games, instead of
+    in memory. It supports the operations that the game graph performs on neighbour lists.
+
+    Representation Invariants:
+    - len(self._buffer) <= SPILL_BUFFER_SIZE
+    """
+    # Private Instance Attributes:
+    # - _graph: A weak reference to the game graph that the neighbours are in. The list must not keep the graph
+    #   alive, so that the temporary file is closed as soon as the graph is dropped.
+    # - _file: The temporary file that the spilled game ids are written to.
+    # - _buffer: The game ids that have not been written to the file yet.
+    # - _length: The number of neighbours in the list.
+
+    _graph: weakref.ref
+    _file: BinaryIO
+    _buffer: array
+    _length: int
+
+    def __init__(self, graph: GameGraph) -> None:
+        """Initializes an empty list of neighbours in the given graph"""
+        self._graph = weakref.ref(graph)
+        self._file = tempfile.TemporaryFile()
+        self._buffer = array('q')
+        self._length = 0
+
+    def append(self, node: GameNode) -> None:
+        """Adds the given node to the end of the list"""
+        self._buffer.append(node.game.game_id)
+        self._length += 1
+        if len(self._buffer) >= SPILL_BUFFER_SIZE:
+            self._flush()
+
+    def __len__(self) -> int:
+        """Returns the number of neighbours in the list"""
+        return self._length
+
+    def __iter__(self) -> Iterator[GameNode]:
+        """Yields the neighbours in the order that they were added, reading them back from disk.
+
+        Every iterator keeps track of its own position in the file and seeks to it before each read, since other
+        iterators over the same list and appends to it move the file's position in between.
+        """
+        offset = 0
+        while True:
+            self._flush()
+            self._file.seek(offset)
+            chunk = self._file.read(SPILL_BUFFER_SIZE * self._buffer.itemsize)
+            if not chunk:
+                return
+            offset += len(chunk)
+            for game_id in array('q', chunk):
+                yield self._graph().get_node(game_id)
+
+    def __contains__(self, node: GameNode) -> bool:
+        """Returns whether the given node is in the list"""
+        return any(neighbour is node for neighbour in self)
+
+    def close(self) -> None:
+        """Deletes the temporary file of the list"""
+        self._file.close()
+
+    def _flush(self) -> None:
+        """Writes the buffered game ids to the end of the temporary file"""
+        self._file.seek(0, os.SEEK_END)
+        self._buffer.tofile(self._file)
+        self._buffer = array('q')
+
+
+# The bytes that a spilled neighbour list holds in memory: the list itself, a pointer to each of its attributes, a full
+# buffer of game ids, and the buffer of its temporary file.
+SPILLED_LIST_BYTES = SpilledNeighbourList.__basicsize__ + POINTER_BYTES * len(SpilledNeighbourList.__annotations__) + \
+    SPILL_BUFFER_SIZE * POINTER_BYTES + io.DEFAULT_BUFFER_SIZE
+
+
+def measure_catalog(catalog: list[Game], seen: set[int]) -> int:
+    """Returns the bytes used by the Game objects of the catalog, apart from their genres and ratings. Objects whose
+    id is in seen are not counted again, and the ids of the counted objects are added to it."""
+    total = 0
+    for game in catalog:
+        total += _sizeof(game, seen) + _sizeof(game.name, seen) + _sizeof(game.game_id, seen)
+        total += _sizeof(game.price, seen) + _sizeof(game.positive_ratio, seen)
+    return total
+
+
+def measure_tags(catalog: list[Game], seen: set[int]) -> int:
+    """Returns the bytes used by the genres of the games in the catalog"""
+    total = 0
+    for game in catalog:
+        total += _sizeof(game.genres, seen)
+        for genre in game.genres:
+            total += _sizeof(genre, seen)
+    return total
+
+
+def measure_metadata(json_result: list[tuple], seen: set[int]) -> int:
+    """Returns the bytes used by the (game id, tags) tuples that were loaded from the metadata file"""
+    total = sys.getsizeof(json_result)
+    for entry in json_result:
+        game_id, tags = entry
+        total += _sizeof(entry, seen) + _sizeof(game_id, seen) + _sizeof(tags, seen)
+        for tag in tags:
+            total += _sizeof(tag, seen)
+    return total
+
+
+def measure_adjacency(graph: GameGraph, seen: set[int]) -> int:
+    """Returns the bytes used by the nodes of the graph and their neighbour lists, which are spilled to disk in the
+    case of a SpilledNeighbourList"""
+    nodes = graph.get_nodes()
+    # The graph maps every game id to its node, and every game id of the user's games to its node.
+    total = sys.getsizeof(dict.fromkeys(range(len(nodes)))) + sys.getsizeof(dict.fromkeys(graph.get_user_nodes()))
+    for node in nodes:
+        total += _sizeof(node, seen) + _sizeof(node.neighbours, seen)
+    return total
+
+
+def measure_scores(catalog: list[Game], seen: set[int]) -> int:
+    """Returns the bytes used by the ratings of the games in the catalog"""
+    return sum(_sizeof(game.rating, seen) for game in catalog if getattr(game, 'rating', None) is not None)
+
+
+def _sizeof(obj: object, seen: set[int]) -> int:
+    """Returns the size of the given object, or 0 if it has already been counted"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, SpilledNeighbourList):
+        return SPILLED_LIST_BYTES
+    if isinstance(obj, (Game, GameNode)):
+        # Each instance attribute is counted as one pointer to its value. Reading the __dict__ of the object instead
+        # would make CPython allocate a dictionary for every object that is measured.
+        size += POINTER_BYTES * len(type(obj).__annotations__)
+    return size
+
+
+def estimate_build(game_file: str, json_file: str, total_nodes: int, num_user_games: int, strategy: str,
+                   reuses_catalog: bool, cap: Optional[int] = None) -> MemoryReport:
+    """Returns the estimated memory report of building a game graph of total_nodes games with the given strategy, by
+    measuring a sample of the datasets. If reuses_catalog is True, the caller has already loaded the catalog, which
+    the full strategy parses a second time.
+
+    Preconditions:
+    - strategy in STRATEGIES
+    - 0 < total_nodes <= 46068
+    - 0 <= num_user_games <= total_nodes
+    - strategy != 'cap_neighbours' or cap is not None
+    """
+    sample, sample_metadata, sample_lines = _sample_datasets(game_file, json_file)
+    num_sampled = max(len(sample), 1)
+    seen = set()
+    catalog_bytes = measure_catalog(sample, seen) * total_nodes // num_sampled
+    tags_bytes = measure_tags(sample, set()) * total_nodes // num_sampled
+
+    if strategy == 'full':
+        # Every line of the metadata file, descriptions included, is held in memory while it is parsed into a tuple
+        # with its tags, and the tuples of the games past the first total_nodes are only discarded after joining.
+        lines_bytes, lines_disk_bytes = sample_lines
+        scale = os.path.getsize(json_file) / max(lines_disk_bytes, 1)
+        metadata_bytes = int((lines_bytes + measure_metadata(sample_metadata, seen)) * scale)
+        if reuses_catalog:
+            # The catalog that the caller has already loaded is still held while the CSV file is parsed again.
+            catalog_bytes *= 2
+    else:
+        metadata_bytes = 0
+        # Interned tags are only stored once, however many games have them.
+        tags_bytes = sum(sys.getsizeof(game.genres) for game in sample) * total_nodes // num_sampled + \
+            sum(sys.getsizeof(tag) for tag in {tag for game in sample for tag in game.genres})
+
+    sample_graph = GameGraph([], [], 0.0)
+    for game in sample:
+        sample_graph.add_game(game)
+    adjacency_bytes = measure_adjacency(sample_graph, set()) * total_nodes // num_sampled
+    if num_user_games > 0:
+        # Every other game is a neighbour of all the user's games, and the user's games are its only neighbours.
+        empty_list_bytes = _list_bytes(0)
+        if strategy in {'full', 'drop_descriptions'}:
+            adjacency_bytes += (total_nodes - num_user_games) * (_list_bytes(num_user_games) - empty_list_bytes)
+        else:
+            adjacency_bytes += sys.getsizeof(tuple(range(num_user_games))) - \
+                (total_nodes - num_user_games) * empty_list_bytes
+        if strategy == 'spill_adjacency':
+            adjacency_bytes += num_user_games * SPILLED_LIST_BYTES
+        elif strategy == 'cap_neighbours':
+            adjacency_bytes += num_user_games * (_list_bytes(cap + num_user_games - 1) - empty_list_bytes)
+        else:
+            adjacency_bytes += num_user_games * (_list_bytes(total_nodes - 1) - empty_list_bytes)
+    scores_bytes = total_nodes * sys.getsizeof(0.5)
+
+    report = MemoryReport()
+    report.record('load', 'catalog', catalog_bytes)
+    report.record('load', 'tags', tags_bytes)
+    report.record('load', 'metadata', metadata_bytes)
+    for stage in ['edges', 'scores']:
+        report.record(stage, 'catalog', catalog_bytes)
+        report.record(stage, 'tags', tags_bytes)
+        report.record(stage, 'adjacency', adjacency_bytes)
+    report.record('scores', 'scores', scores_bytes)
+    return report
+
+
+def _list_bytes(length: int) -> int:
+    """Returns the size of a list that has grown to the given length by appending to it one item at a time, which
+    is how neighbour lists grow"""
+    items = []
+    for _ in range(length):
+        items.append(None)
+    return sys.getsizeof(items)
+
+
+def _sample_datasets(game_file: str, json_file: str) -> tuple[list[Game], list[tuple], tuple[int, int]]:
+    """Returns the first SAMPLE_SIZE games of the datasets along with their genres, the (game id, tags) tuples of the
+    first SAMPLE_SIZE lines of the metadata file, and the number of bytes that those lines take up in memory and in
+    the file"""
+    with open(game_file, encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)  # skip headers
+        games = {}
+        for row in islice(reader, SAMPLE_SIZE):
+            game = game_from_row(row)
+            games[game.game_id] = game
+
+    sample = []
+    metadata = []
+    lines_bytes = 0
+    lines_disk_bytes = 0
+    with open(json_file, encoding='utf-8') as f:
+        for line in islice(f, SAMPLE_SIZE):
+            lines_bytes += sys.getsizeof(line) + POINTER_BYTES
+            lines_disk_bytes += len(line.encode('utf-8'))
+            metadata.append(metadata_from_line(line))
+            if metadata[-1][0] in games:
+                games[metadata[-1][0]].genres = metadata[-1][1]
+                sample.append(games[metadata[-1][0]])
+    return sample, metadata, (lines_bytes, lines_disk_bytes)
+
+
+def build_graph_within_budget(game_file: str, json_file: str, user_info: tuple, max_price: float, total_nodes: int,
+                              byte_budget: int, games: Optional[dict[int, Game]] = None) -> BuildResult:
+    """Builds and scores the same game graph as generate_graph with the first strategy that is estimated to fit within
+    byte_budget bytes, and returns the graph along with the strategy and the memory reports of the build.
+
+    If games is given, it must be the result of read_data_csv(game_file, total_nodes), which every strategy but the
+    full one reuses instead of parsing the CSV file again.
+
+    Preconditions:
+    - game_file refers to a csv file consisting of games and their attributes.
+    - json_file is a json file that consists of the every game's genre in.
+    - len(user_info) == 2
+    - 0 < total_nodes <= 46068
+    - byte_budget > 0
+    """
+    if total_nodes > 46068:
+        raise ValueError("There are a maximum of 46068 games in the game file.")
+
+    num_user_games = len(set(user_info[0]))
+    estimates = {}
+    strategy = None
+    estimated = None
+    cap = None
+    for candidate in STRATEGIES:
+        if candidate == 'cap_neighbours':
+            if num_user_games == 0:
+                break
+            cap = _largest_cap(game_file, json_file, total_nodes, num_user_games, byte_budget, games is not None)
+            if cap is None:
+                break
+        report = estimate_build(game_file, json_file, total_nodes, num_user_games, candidate, games is not None, cap)
+        estimates[candidate] = report.peak()
+        if report.peak() <= byte_budget:
+            strategy = candidate
+            estimated = report
+            break
+
+    if num_user_games == 0:
+        # Without any user games, the graph has no edges to degrade.
+        smallest_peak = estimate_build(game_file, json_file, total_nodes, 0, 'share_neighbours', games is not None)
+    else:
+        smallest_peak = estimate_build(game_file, json_file, total_nodes, num_user_games, 'cap_neighbours',
+                                       games is not None, 1)
+    if strategy is None:
+        raise ValueError(f"A game graph of {total_nodes} games cannot be built within {byte_budget} bytes. The most "
+                         f"degraded build is estimated to take {smallest_peak.peak()} bytes.")
+
+    measured = MemoryReport()
+    seen = set()
+    if strategy == 'full':
+        # The same steps as load_catalog, so that the metadata can be measured before it is discarded.
+        json_result = read_metadata_json(json_file)
+        catalog = join_catalog(read_data_csv(game_file, total_nodes), json_result, total_nodes)
+        measured.record('load', 'catalog', measure_catalog(catalog, seen))
+        measured.record('load', 'tags', measure_tags(catalog, seen))
+        # The metadata is discarded after this stage, so the ids of its objects must not be remembered as measured.
+        measured.record('load', 'metadata', measure_metadata(json_result, set(seen)))
+        del json_result
+    else:
+        catalog = _load_compact_catalog(game_file, json_file, total_nodes, games)
+        measured.record('load', 'catalog', measure_catalog(catalog, seen))
+        measured.record('load', 'tags', measure_tags(catalog, seen))
+        measured.record('load', 'metadata', 0)
+
+    graph = GameGraph(user_info[0], user_info[1], max_price)
+    for game in catalog:
+        graph.add_game(game)
+    if strategy == 'full' or strategy == 'drop_descriptions':
+        graph.add_all_edges()
+    elif strategy == 'share_neighbours' or strategy == 'spill_adjacency':
+        _add_shared_edges(graph, strategy == 'spill_adjacency')
+    else:
+        _add_capped_edges(graph, cap)
+    for stage in ['edges', 'scores']:
+        measured.record(stage, 'catalog', measured.stages['load']['catalog'])
+        measured.record(stage, 'tags', measured.stages['load']['tags'])
+    measured.record('edges', 'adjacency', measure_adjacency(graph, seen))
+    measured.record('scores', 'adjacency', measured.stages['edges']['adjacency'])
+
+    if strategy == 'cap_neighbours':
+        # The other games have already been scored while choosing the neighbours to keep.
+        for user_node in graph.get_user_nodes():
+            graph.compute_score(user_node)
+    else:
+        graph.assign_all_scores()
+    measured.record('scores', 'scores', measure_scores(catalog, seen))
+
+    return BuildResult(graph, strategy, byte_budget, estimates, estimated, measured,
+                       cap if strategy == 'cap_neighbours' else None, smallest_peak.peak())
+
+
+def _largest_cap(game_file: str, json_file: str, total_nodes: int, num_user_games: int, byte_budget: int,
+                 reuses_catalog: bool) -> Optional[int]:
+    """Returns the largest number of neighbours of each of the user's games for which the cap_neighbours strategy is
+    estimated to fit within the budget, or None if not even a single neighbour fits."""
+    without_neighbours = estimate_build(game_file, json_file, total_nodes, num_user_games, 'cap_neighbours',
+                                        reuses_catalog, 0).peak()
+    cap = min((byte_budget - without_neighbours) // (num_user_games * POINTER_BYTES), total_nodes - 1)
+    # Appending to lists overallocates, so the cap is lowered until its estimate fits within the budget.
+    while cap > 0 and estimate_build(game_file, json_file, total_nodes, num_user_games, 'cap_neighbours',
+                                     reuses_catalog, cap).peak() > byte_budget:
+        cap -= max(cap // 8, 1)
+    return cap if cap > 0 else None
+
+
+def _load_compact_catalog(game_file: str, json_file: str, total_nodes: int,
+                          games: Optional[dict[int, Game]]) -> list[Game]:
+    """Returns the same catalog as game_graph.load_catalog, while streaming the metadata file so that only one line
+    of it is held in memory at a time, interning the tags, and reusing the already loaded games if they are given."""
+    if games is None:
+        games = read_data_csv(game_file, total_nodes)
+
+    catalog = []
+    with open(json_file, encoding='utf-8') as f:
+        for line in islice(f, total_nodes):
+            game_id, tags = metadata_from_line(line)
+            game = games[game_id]
+            game.genres = [sys.intern(tag) for tag in tags]
+            catalog.append(game)
+    return catalog
+
+
+def _add_shared_edges(graph: GameGraph, spill: bool) -> None:
+    """Creates the same edges as GameGraph.add_all_edges, except that every game that the user has not played shares
+    a single tuple of the user's games as its neighbours. If spill is True, the neighbour lists of the user's games
+    are spilled to disk."""
+    user_nodes = graph.get_user_nodes()
+    if not user_nodes:
+        return
+
+    nodes = graph.get_nodes()
+    shared_neighbours = tuple(user_nodes)
+    for node in nodes:
+        if node not in shared_neighbours:
+            node.neighbours = shared_neighbours
+    for user_node in user_nodes:
+        if spill:
+            user_node.neighbours = SpilledNeighbourList(graph)
+        for other_node in nodes:
+            if user_node is not other_node:
+                user_node.neighbours.append(other_node)
+
+
+def _add_capped_edges(graph: GameGraph, cap: int) -> None:
+    """Creates the same edges as GameGraph.add_all_edges, except that every game that the user has not played shares
+    a single tuple of the user's games as its neighbours, the neighbour list of each of the user's games only keeps
+    the cap other games with the highest scores, and scores every game that the user has not played.
+
+    The neighbours of every other game are still all the user's games, so its score is the same as in the full graph,
+    and the games that are kept are the ones that GameGraph.recommendations would yield first.
+    """
+    user_nodes = graph.get_user_nodes()
+    if not user_nodes:
+        return
+
+    shared_neighbours = tuple(user_nodes)
+    other_nodes = [node for node in graph.get_nodes() if node not in shared_neighbours]
+    for other_node in other_nodes:
+        other_node.neighbours = shared_neighbours
+        graph.compute_score(other_node)
+    kept = heapq.nsmallest(cap, other_nodes, key=lambda node: (-node.game.rating, node.game.game_id))
+
+    for user_node in user_nodes:
+        for other_node in user_nodes:
+            if user_node is not other_node:
+                user_node.neighbours.append(other_node)
+        for other_node in kept:
+            user_node.neighbours.append(other_node)
+
+
+def _format_bytes(num_bytes: int) -> str:
+    """Returns the given number of bytes in a human readable form"""
+    for unit in ['B', 'KiB', 'MiB']:
+        if abs(num_bytes) < 1024:
+            return f'{num_bytes:.1f} {unit}'
+        num_bytes /= 1024
+    return f'{num_bytes:.1f} GiB'
+
+
+if __name__ == '__main__':
+    import python_ta
+
+    python_ta.check_all(config={
+        'extra-imports': ['array', 'itertools', 'csv', 'heapq', 'io', 'os', 'sys', 'tempfile', 'weakref',
+                          'game_graph'],
+        'allowed-io': [],
+        'max-line-length': 120,
+        'disable': ['forbidden-IO-function']
+    })
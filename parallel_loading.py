@@ -0,0 +1,205 @@
+"""
+CSC111 Winter 2023 Project: Steam Game Recommender
+
+This module consists of parallel versions of the dataset loaders in game_graph. Each file is split into byte ranges
+that start and end on a newline, the ranges are parsed by worker processes into columns that only hold the fields
+that the loaders keep, and the columns are concatenated back in file order. The results are identical to the ones of
+read_data_csv and read_metadata_json.
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2023 Mikhael Orteza, Muaj Ahmed, Cheng Peng, and Ari Casas Nassar
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, Optional
+import csv
+import io
+import os
+import time
+from game_graph import Game, join_catalog, metadata_from_line, read_data_csv, read_metadata_json
+
+# The number of byte ranges that each worker process parses on average. Having more ranges than workers balances the
+# load between them, and lets read_data_csv_parallel stop early once it has read enough rows.
+RANGES_PER_WORKER = 4
+
+
+def byte_ranges(file_name: str, num_ranges: int, start: int = 0) -> list[tuple[int, int]]:
+    """Returns up to num_ranges (start, end) byte ranges that cover the given file from the start position onwards.
+    Every range ends right after a newline, or at the end of the file, so no line is split between two ranges.
+
+    Preconditions:
+    - num_ranges > 0
+    - 0 <= start <= os.path.getsize(file_name)
+    """
+    size = os.path.getsize(file_name)
+    ranges = []
+    with open(file_name, 'rb') as f:
+        range_start = start
+        for index in range(1, num_ranges + 1):
+            if range_start >= size:
+                break
+            f.seek(max(range_start, start + (size - start) * index // num_ranges))
+            f.readline()  # Move to the end of the line that the split falls in
+            range_end = min(f.tell(), size)
+            if range_end > range_start:
+                ranges.append((range_start, range_end))
+            range_start = range_end
+    return ranges
+
+
+def _read_range(file_name: str, start: int, end: int) -> io.TextIOWrapper:
+    """Returns the given byte range of the file as a text stream, which is decoded in the same way as open decodes
+    the whole file."""
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')
+
+
+def _parse_metadata_range(file_range: tuple[str, int, int]) -> tuple[list[int], list[list[str]]]:
+    """Returns the app ids and tags of every line in the given byte range of a metadata JSON file, as two columns.
+    The lines are parsed in the same way as read_metadata_json parses them."""
+    ids = []
+    tags = []
+    for line in _read_range(*file_range):
+        game_id, game_tags = metadata_from_line(line)
+        ids.append(game_id)
+        tags.append(game_tags)
+    return ids, tags
+
+
+def _parse_csv_range(file_range: tuple[str, int, int]) -> tuple[list[int], list[str], list[int], list[float]]:
+    """Returns the game ids, names, positive ratios and final prices of every row in the given byte range of a game
+    CSV file, as four columns. The rows are parsed in the same way as read_data_csv parses them."""
+    ids = []
+    names = []
+    positive_ratios = []
+    prices = []
+    for row in csv.reader(_read_range(*file_range)):
+        ids.append(int(row[0]))
+        names.append(row[1])
+        positive_ratios.append(int(row[7]))
+        prices.append(float(row[9]))
+    return ids, names, positive_ratios, prices
+
+
+def _map_ranges(parse: Callable, file_name: str, ranges: list[tuple[int, int]],
+                workers: Optional[int]) -> Iterator[tuple]:
+    """Yields the columns that parse returns for each byte range of the file, in file order.
+
+    The ranges are parsed by workers processes, or by as many processes as there are cores if workers is None. If
+    workers is 1, the ranges are parsed in this process instead. Once the caller stops iterating, the ranges that
+    have not been parsed yet are cancelled.
+    """
+    file_ranges = [(file_name, start, end) for start, end in ranges]
+    if workers == 1:
+        yield from map(parse, file_ranges)
+        return
+
+    executor = ProcessPoolExecutor(workers)
+    try:
+        futures = [executor.submit(parse, file_range) for file_range in file_ranges]
+        for future in futures:
+            yield future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def read_metadata_json_parallel(json_file: str, workers: Optional[int] = None) -> list[tuple]:
+    """Returns the same list of (game id, tags) tuples as read_metadata_json, by parsing newline aligned byte ranges
+    of the file in parallel.
+
+    Preconditions:
+        - json_file refers to a valid JSON file in terms of its format, meaning that it consists of the game id,
+        description, and genres of all the games.
+        - workers is None or workers >= 1
+    """
+    num_workers = workers or os.cpu_count() or 1
+    ranges = byte_ranges(json_file, num_workers * RANGES_PER_WORKER)
+
+    result = []
+    for ids, tags in _map_ranges(_parse_metadata_range, json_file, ranges, workers):
+        result.extend(zip(ids, tags))
+    return result
+
+
+def read_data_csv_parallel(csv_file: str, total_rows: int, workers: Optional[int] = None) -> dict[int, Game]:
+    """Returns the same mapping between game ids and Game objects as read_data_csv, by parsing newline aligned byte
+    ranges of the file in parallel.
+
+    Preconditions:
+    - csv_file refers to a valid CSV file, meaning that it consists of all the characteristics of every steam game.
+    - no field of the CSV file contains a newline
+    - total_rows >= 0
+    - workers is None or workers >= 1
+    """
+    with open(csv_file, 'rb') as f:
+        f.readline()  # skip headers
+        header_end = f.tell()
+    num_workers = workers or os.cpu_count() or 1
+    ranges = byte_ranges(csv_file, num_workers * RANGES_PER_WORKER, header_end)
+
+    result = {}
+    # Like read_data_csv, the first total_rows + 1 rows are loaded.
+    rows_left = total_rows + 1
+    for ids, names, positive_ratios, prices in _map_ranges(_parse_csv_range, csv_file, ranges, workers):
+        for index in range(0, min(rows_left, len(ids))):
+            result[ids[index]] = Game((ids[index], names[index]), [], prices[index], positive_ratios[index])
+        rows_left -= min(rows_left, len(ids))
+        if rows_left == 0:
+            break
+    return result
+
+
+def load_catalog_parallel(game_file: str, json_file: str, total_nodes: int,
+                          workers: Optional[int] = None) -> list[Game]:
+    """Returns the same catalog as game_graph.load_catalog, by loading both datasets in parallel.
+
+    Preconditions:
+    - game_file refers to a csv file consisting of games and their attributes.
+    - json_file is a json file that consists of the every game's genre in.
+    - total_nodes >= 0
+    - total_nodes <= 46068
+    - workers is None or workers >= 1
+    """
+    if total_nodes > 46068:
+        raise ValueError("There are a maximum of 46068 games in the game file.")
+
+    json_result = read_metadata_json_parallel(json_file, workers)
+    csv_result = read_data_csv_parallel(game_file, total_nodes, workers)
+    return join_catalog(csv_result, json_result, total_nodes)
+
+
+def run_benchmark(game_file: str, json_file: str, worker_counts: Optional[list[int]] = None) -> None:
+    """Prints how long the serial and the parallel loaders take to load the whole datasets, for each number of
+    workers, and checks that the parallel loaders give the same results as the serial ones.
+    """
+    if worker_counts is None:
+        worker_counts = [1, 2, 4, 8]
+    total_rows = 46068
+
+    start = time.perf_counter()
+    expected_metadata = read_metadata_json(json_file)
+    expected_games = read_data_csv(game_file, total_rows)
+    serial_time = time.perf_counter() - start
+    expected = (expected_metadata, [(game.game_id, game.name, game.price, game.positive_ratio)
+                                    for game in expected_games.values()])
+    print(f'serial: {serial_time:.3f}s')
+
+    for workers in worker_counts:
+        start = time.perf_counter()
+        metadata = read_metadata_json_parallel(json_file, workers)
+        games = read_data_csv_parallel(game_file, total_rows, workers)
+        parallel_time = time.perf_counter() - start
+        actual = (metadata, [(game.game_id, game.name, game.price, game.positive_ratio) for game in games.values()])
+        print(f'{workers} workers: {parallel_time:.3f}s ({serial_time / parallel_time:.2f}x), '
+              f'identical: {actual == expected}')
+
+
+if __name__ == '__main__':
+    run_benchmark('datasets/games.csv', 'datasets/games_metadata.json')
@@ -0,0 +1,80 @@
+"""
+CSC111 Winter 2023 Project: Steam Game Recommender
+
+This module consists of a startup benchmark that measures, in fresh interpreters, how long it takes to import the
+recommender core and to cold start a process that uses it, both without the tkinter user interface and with it, which
+is what importing the core used to cost.
+
+This file is provided solely for the personal and private use of students
+taking CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright for CSC111 materials,
+please consult our Course Syllabus.
+
+This file is Copyright (c) 2023 Mikhael Orteza, Muaj Ahmed, Cheng Peng, and Ari Casas Nassar
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# The modules that must never be loaded by importing the recommender core.
+GUI_MODULES = ['tkinter', 'webbrowser', 'user_interface']
+
+# Each script imports the given modules, and prints the import time followed by whether any GUI module was loaded.
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+{imports}
+print(time.perf_counter() - start, any(name in sys.modules for name in {gui_modules!r}))
+"""
+
+
+def measure_startup(modules: list[str], runs: int) -> tuple[float, float, bool]:
+    """Returns the median import time and the median cold start time of a fresh interpreter that imports the given
+    modules, along with whether any GUI module was loaded by them.
+
+    Preconditions:
+    - runs > 0
+    """
+    script = IMPORT_SCRIPT.format(imports='\n'.join(f'import {module}' for module in modules),
+                                  gui_modules=GUI_MODULES)
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    import_times = []
+    cold_start_times = []
+    loads_gui = False
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', script], cwd=project_dir, capture_output=True, text=True,
+                                check=True).stdout.split()
+        cold_start_times.append(time.perf_counter() - start)
+        import_times.append(float(output[0]))
+        loads_gui = loads_gui or output[1] == 'True'
+
+    return statistics.median(import_times), statistics.median(cold_start_times), loads_gui
+
+
+def run_benchmark(runs: int = 20) -> None:
+    """Prints the startup times of the headless recommender core and of the core along with the user interface.
+
+    Preconditions:
+    - runs > 0
+    """
+    scenarios = [('core (game_graph, catalog_scoring)', ['game_graph', 'catalog_scoring']),
+                 ('core with user interface', ['game_graph', 'catalog_scoring', 'user_interface'])]
+    results = []
+    for name, modules in scenarios:
+        import_time, cold_start_time, loads_gui = measure_startup(modules, runs)
+        results.append((import_time, cold_start_time))
+        print(f'{name}: import {import_time * 1000:.1f} ms, cold start {cold_start_time * 1000:.1f} ms, '
+              f'loads GUI modules: {loads_gui}')
+
+    core, with_gui = results
+    print(f'the headless core saves {(with_gui[0] - core[0]) * 1000:.1f} ms of import time and '
+          f'{(with_gui[1] - core[1]) * 1000:.1f} ms of cold start time')
+
+
+if __name__ == '__main__':
+    run_benchmark()
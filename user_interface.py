@@ -262,18 +262,26 @@ class GameRecommendations:
 
     Instance Attributes:
     - top_games: the top games that will be recommended to the user.
+    - more_games: a cursor that yields more recommended games in order of their score once the user scrolls to the
+    bottom of the list, or None if no more games should be loaded.
+    - page_size: the number of games that are loaded every time the user scrolls to the bottom of the list.
     - root: the root window that is displayed on the user interface.
     - label: tells the user about the recommended games that have been displayed with their steam links.
+    - listbox: the listbox that holds the recommended games and their steam links.
+    - scrollbar: the scrollbar that is linked to the listbox.
 
     """
 
-    def __init__(self, top_games: list) -> None:
-        self.top_games = top_games
+    def __init__(self, top_games: list, more_games=None) -> None:
+        self.top_games = []
+        self.more_games = more_games
+        self.page_size = max(len(top_games), 1)
         self.root = tk.Tk()
         self.root.title("Steam Game Recommender")
         self.root.geometry("1920x1080")
 
         self.display_games()
+        self.add_games(top_games)
 
         self.root.mainloop()
 
@@ -289,30 +297,44 @@ class GameRecommendations:
         frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
 
         # Create a listbox widget inside the frame
-        listbox = tk.Listbox(frame, font=("Arial", 12), height=20, width=100)
-        listbox.grid(row=0, column=0, sticky="nsew")
+        self.listbox = tk.Listbox(frame, font=("Arial", 12), height=20, width=100)
+        self.listbox.grid(row=0, column=0, sticky="nsew")
 
         # Create a scrollbar widget and link it to the listbox
-        scrollbar = tk.Scrollbar(frame, orient=tk.VERTICAL)
-        scrollbar.grid(row=0, column=1, sticky="ns")
-        listbox.config(yscrollcommand=scrollbar.set)
-        scrollbar.config(command=listbox.yview)
-
-        # Insert game information into the listbox
-        for idx, game in enumerate(self.top_games):
-            label_text = f"{idx + 1}. {game.name}"
-            link_text = f"https://store.steampowered.com/app/{game.game_id}"
-            listbox.insert(tk.END, label_text)
-            listbox.insert(tk.END, link_text)
-            listbox.insert(tk.END, "")  # Add a blank line between games
+        self.scrollbar = tk.Scrollbar(frame, orient=tk.VERTICAL)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.listbox.config(yscrollcommand=self.on_scroll)
+        self.scrollbar.config(command=self.listbox.yview)
 
         # Bind a function to the <Button-1> event of the listbox
-        listbox.bind("<Button-1>", self.open_link)
+        self.listbox.bind("<Button-1>", self.open_link)
 
         # Create a button to quit the application
         quit_button = tk.ttk.Button(self.root, text="Quit", command=self.root.destroy)
         quit_button.grid(row=2, column=0, pady=10)
 
+    def add_games(self, games: list) -> None:
+        """Inserts the given games and their steam links at the end of the listbox."""
+        for game in games:
+            self.top_games.append(game)
+            label_text = f"{len(self.top_games)}. {game.name}"
+            link_text = f"https://store.steampowered.com/app/{game.game_id}"
+            self.listbox.insert(tk.END, label_text)
+            self.listbox.insert(tk.END, link_text)
+            self.listbox.insert(tk.END, "")  # Add a blank line between games
+
+    def on_scroll(self, first: str, last: str) -> None:
+        """Updates the scrollbar and loads the next page of recommended games once the user has scrolled to the
+        bottom of the listbox."""
+        self.scrollbar.set(first, last)
+        if float(last) >= 1.0 and self.more_games is not None:
+            more_games = self.more_games.next_page(self.page_size)
+            if more_games:
+                self.add_games(more_games)
+            else:
+                # The cursor has run out of games, so there is nothing more to load
+                self.more_games = None
+
     def open_link(self, event) -> None:
         """Opens the link associated with the clicked game."""
         widget = event.widget